@@ -2,214 +2,1368 @@
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import heapq
+import itertools
 import logging
-import re
-import socket
-import threading
-import time
-from typing import Any
+import math
+import random
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import IntEnum, StrEnum
+from typing import Any, cast
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 
-from .const import DEFAULT_PORT, DOMAIN, PLATFORMS
+from .const import (
+    CONF_ADDRESSES,
+    CONF_BURST,
+    CONF_CHANNEL_COUNT,
+    CONF_INPUT_COUNT,
+    CONF_OVERFLOW_POLICY,
+    CONF_QUEUE_SIZE,
+    CONF_RATE_LIMIT,
+    CONF_SPLIT_CONNECTIONS,
+    CONNECTION_LINGER,
+    DATA_CONNECTIONS,
+    DEFAULT_BURST,
+    DEFAULT_CHANNEL_COUNT,
+    DEFAULT_INPUT_COUNT,
+    DEFAULT_OVERFLOW_POLICY,
+    DEFAULT_PORT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WRITE_WINDOW,
+    DOMAIN,
+    INPUT_READ_ATTEMPTS,
+    KEEPALIVE_INTERVAL,
+    PLATFORMS,
+    RECONNECT_MAX_DELAY,
+    RECONNECT_MIN_DELAY,
+    STATE_CACHE_TTL,
+    STATS_SAVE_DELAY,
+    STATS_STORAGE_VERSION,
+)
+from .coordinator import KinconyCoordinator
+from .metrics import TransportMetrics
+from .protocol import (
+    DEFAULT_ADDRESS,
+    Command,
+    Frame,
+    FrameParser,
+    ProtocolError,
+    apply_input_report,
+    apply_relay_report,
+    parse_channel_count,
+    parse_frame,
+    parse_relay_get_input,
+    parse_relay_read,
+    parse_relay_set,
+    parse_relay_set_all,
+    parse_relay_state,
+    relay_get_input,
+    relay_read,
+    relay_scan,
+    relay_set,
+    relay_set_all,
+    relay_state,
+    relay_test,
+)
+from .services import async_setup_services
+from .stats import RelayStats
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class Priority(IntEnum):
+    """Scheduling class of a command; lower values are sent first."""
+
+    TIMED = 0
+    INTERACTIVE = 1
+    BACKGROUND = 2
+    POLL = 3
+
+
+class OverflowPolicy(StrEnum):
+    """What a command does when it finds the command queue full.
+
+    Timed commands are never turned away, so a pulse always ends, and
+    neither are keepalive probes, which ask for at most one slot at a time.
+    """
+
+    # Fail the poll that has waited longest and queue the new command.
+    DROP_OLDEST_POLL = "drop_oldest_poll"
+    # Fail the new command.
+    REJECT = "reject"
+    # Share the reply of an identical queued command, or fail.
+    COALESCE = "coalesce"
+
+
+@dataclass(frozen=True, slots=True)
+class TransportLimits:
+    """How hard one connection may drive the board."""
+
+    rate: float = DEFAULT_RATE_LIMIT
+    burst: int = DEFAULT_BURST
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST_POLL
+
+
+class PollDropped(ConnectionError):
+    """A queued poll was shed to make room for a newer command."""
+
+
+class _TokenBucket:
+    """Spaces commands to a steady rate once a burst is used up."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated: float | None = None
+
+    def take(self, now: float) -> float:
+        """Take a token and return how long to wait until it is earned."""
+        if self._updated is not None:
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+        self._updated = now
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self._rate)
+
+
+class _PriorityLock:
+    """Lock that hands the connection to the most urgent waiter first.
+
+    Waiters of the same priority are served in arrival order.
+    """
+
+    def __init__(self) -> None:
+        self._locked = False
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    async def acquire(self, priority: Priority) -> None:
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled right after being handed the lock: pass it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def drop_oldest(self, priority: Priority, exc: Exception) -> bool:
+        """Fail the longest waiting waiter of a priority, if there is one."""
+        waiting = [
+            waiter
+            for waiter in self._waiters
+            if waiter[0] == priority and not waiter[2].done()
+        ]
+        if not waiting:
+            return False
+        min(waiting)[2].set_exception(exc)
+        return True
+
+    def release(self) -> None:
+        while self._waiters:
+            _priority, _sequence, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Ownership moves straight to the waiter; the lock stays held.
+                future.set_result(None)
+                return
+        self._locked = False
+
+
+class _KProtocol(asyncio.BufferedProtocol):
+    """One TCP connection to the board, feeding complete frames to KTransport."""
+
+    def __init__(self, owner: KTransport) -> None:
+        self._owner = owner
+        self._parser = FrameParser()
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.Transport, transport)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._owner._connection_lost(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._parser.get_buffer()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._owner.metrics.bytes_received += nbytes
+        for raw in self._parser.buffer_updated(nbytes):
+            self._owner._frame_received(raw)
+
+
 class KTransport:
-    """Basic TCP transport with a shared socket and lock."""
+    """Asyncio TCP transport that matches framed replies to their commands.
+
+    While async_maintain() runs, the connection is kept up in the background:
+    dropped links are reopened with capped exponential backoff, an idle link
+    is probed with RELAY-TEST-NOW, and commands fail fast while the board is
+    unreachable instead of each paying the connect timeout.
+
+    Every board has its own queue: commands take turns on its connection by
+    Priority, entirely on the event loop, so a hung board only holds up its
+    own commands and no executor thread. A switch press overtakes queued
+    background polls. A poll that is still queued when the
+    same poll is requested again is shared instead of being sent twice.
+
+    With limits set, commands leave at most at the configured rate after a
+    burst, and the number of commands waiting for the connection is bounded;
+    the overflow policy decides what happens to a command beyond that.
 
-    def __init__(self, host: str, port: int) -> None:
+    Firmware that accepts several clients can be given a poll link: a second
+    connection that carries the polls, so a slow poll neither delays nor, by
+    timing out, tears down the connection switch presses use. Polls fall
+    back to the main connection whenever the poll link is down or refused.
+    """
+
+    def __init__(
+        self, host: str, port: int, limits: TransportLimits | None = None
+    ) -> None:
         self.address = (host, port)
-        self.lock = threading.Lock()
-        self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.s.settimeout(5)
-        self.connected = False
+        self.lock = _PriorityLock()
+        # Commands waiting for their turn, by payload, with the future their
+        # callers share.
+        self._queued: dict[str, asyncio.Future[Frame]] = {}
+        self._poll_link: KTransport | None = None
+        self._poll_link_task: asyncio.Task[None] | None = None
+        self._maintained = False
+        self.limits: TransportLimits | None = None
+        self._bucket: _TokenBucket | None = None
+        self.set_limits(limits)
+        # Commands waiting for this connection; with a poll link, the shared
+        # metrics count both.
+        self._waiting = 0
+        self._connection: _KProtocol | None = None
+        self._pending: deque[tuple[Command, asyncio.Future[Frame]]] = deque()
+        self._listeners: list[Callable[[Frame], None]] = []
+        self._connect_listeners: list[Callable[[], None]] = []
+        self._closed = asyncio.Event()
+        self._closed.set()
+        self._link_down = False
+        self._last_activity = 0.0
+        self._ever_connected = False
+        self.metrics = TransportMetrics()
 
-    def _send(self, command: str) -> None:
-        self.s.sendall(command.encode())
+    def set_limits(self, limits: TransportLimits | None) -> None:
+        """Apply a rate limit and queue bound, or lift them with None."""
+        self.limits = limits
+        self._bucket = (
+            None if limits is None else _TokenBucket(limits.rate, limits.burst)
+        )
+        if self._poll_link is not None:
+            # Both links draw on one budget; it is the board that is limited.
+            self._poll_link.limits = limits
+            self._poll_link._bucket = self._bucket
 
-    def _read(self) -> str:
-        return self.s.recv(1024).decode("utf-8")
+    def set_poll_link(self, enabled: bool) -> None:
+        """Carry polls over a second connection of their own, or stop."""
+        if enabled == (self._poll_link is not None):
+            return
+        if not enabled:
+            assert self._poll_link is not None
+            self._stop_poll_link()
+            self._poll_link.close()
+            self._poll_link = None
+            return
+        link = self._poll_link = KTransport(*self.address)
+        link.metrics = self.metrics
+        link.limits = self.limits
+        link._bucket = self._bucket
+        link.add_listener(self._push_received)
+        link.add_connect_listener(self._connected)
+        if self._maintained:
+            self._start_poll_link()
 
-    def getLock(self) -> threading.Lock:
-        return self.lock
+    def _start_poll_link(self) -> None:
+        if self._poll_link is not None and self._poll_link_task is None:
+            self._poll_link_task = asyncio.get_running_loop().create_task(
+                self._poll_link.async_maintain()
+            )
 
-    def call(self, command: str) -> str:
-        if not self.connected:
-            try:
-                self.s.connect(self.address)
-                self.connected = True
-            except Exception as exc:
-                raise ConnectionError("Cannot connect socket") from exc
+    def _stop_poll_link(self) -> None:
+        if self._poll_link_task is not None:
+            self._poll_link_task.cancel()
+            self._poll_link_task = None
+
+    @property
+    def connected(self) -> bool:
+        connection = self._connection
+        return (
+            connection is not None
+            and connection.transport is not None
+            and not connection.transport.is_closing()
+        )
 
+    async def _connect(self) -> None:
+        loop = asyncio.get_running_loop()
         try:
-            self._send(command)
-        except BrokenPipeError:
-            with contextlib.suppress(OSError):
-                self.s.close()
-            self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.s.settimeout(5)
-            self.connected = False
-            time.sleep(1)
-            return self.call(command)
+            async with asyncio.timeout(DEFAULT_TIMEOUT):
+                _transport, connection = await loop.create_connection(
+                    lambda: _KProtocol(self), *self.address
+                )
+        except (OSError, TimeoutError) as exc:
+            raise ConnectionError("Cannot connect socket") from exc
+        if self._ever_connected:
+            self.metrics.reconnects += 1
+        self._ever_connected = True
+        self._connection = connection
+        self._closed.clear()
+        self._link_down = False
+        self._last_activity = loop.time()
+        self._connected()
+
+    def _connected(self) -> None:
+        for listener in list(self._connect_listeners):
+            listener()
 
+    async def async_connect(self) -> None:
+        """Open the connection if it is not already up."""
+        await self.lock.acquire(Priority.BACKGROUND)
+        started = asyncio.get_running_loop().time()
         try:
-            result = self._read()
-        except Exception as exc:
-            with contextlib.suppress(OSError):
-                self.s.close()
-            self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.s.settimeout(5)
-            self.connected = False
-            raise ConnectionError("Socket read error") from exc
+            if not self.connected:
+                await self._connect()
+        finally:
+            self._release(started)
 
-        return result
+    async def async_maintain(self) -> None:
+        """Keep the connection, and the poll link if any, up until cancelled."""
+        self._maintained = True
+        self._start_poll_link()
+        try:
+            await self._async_maintain()
+        finally:
+            self._maintained = False
+            self._stop_poll_link()
 
-    def close(self) -> None:
-        with self.lock:
-            with contextlib.suppress(OSError):
-                self.s.close()
-            self.connected = False
-
-
-class KConnection:
-    """High-level Kincony commands for a given relay index."""
-
-    def __init__(self, s: KTransport, index: str) -> None:
-        self.s = s
-        self.index = index
-
-    def send2K(self, action_type: str) -> str:
-        kcode = "255"
-
-        if action_type == "on" and self.index == "all":
-            command = "RELAY-SET_ALL-" + kcode + ",255"
-        elif action_type == "off" and self.index == "all":
-            command = "RELAY-SET_ALL-" + kcode + ",0"
-        elif action_type == "on":
-            command = "RELAY-SET-" + kcode + "," + self.index + ",1"
-        elif action_type == "off":
-            command = "RELAY-SET-" + kcode + "," + self.index + ",0"
-        elif action_type == "get":
-            command = "RELAY-READ-" + kcode + "," + self.index
-        elif action_type == "test":
-            command = "RELAY-TEST-NOW"
-        elif action_type == "scan":
-            command = "RELAY-SCAN_DEVICE-NOW"
+    async def _async_maintain(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay: float = RECONNECT_MIN_DELAY
+        while True:
+            try:
+                await self.async_connect()
+            except ConnectionError as err:
+                self._link_down = True
+                wait = random.uniform(delay / 2, delay)
+                _LOGGER.debug(
+                    "Cannot reach %s (%s), retrying in %.1fs", self.address, err, wait
+                )
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            up_since = loop.time()
+            await self._async_keepalive()
+            if loop.time() - up_since >= KEEPALIVE_INTERVAL:
+                delay = RECONNECT_MIN_DELAY
+                continue
+            # Dropped right away, as by a board that has no client slot
+            # left: back off instead of reconnecting in a tight loop.
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _async_keepalive(self) -> None:
+        """Probe the link whenever it has been quiet; return once it drops."""
+        loop = asyncio.get_running_loop()
+        while self.connected:
+            idle = loop.time() - self._last_activity
+            if idle >= KEEPALIVE_INTERVAL:
+                try:
+                    await self.call(relay_test(), Priority.BACKGROUND)
+                except ConnectionError:
+                    # The link may still be up; wait a full interval before
+                    # the next probe rather than retrying at once.
+                    idle = 0.0
+                else:
+                    continue
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(KEEPALIVE_INTERVAL - idle):
+                    await self._closed.wait()
+
+    def add_listener(self, listener: Callable[[Frame], None]) -> Callable[[], None]:
+        """Register a callback for frames that answer no pending command."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def add_connect_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback for every time the connection comes up."""
+        self._connect_listeners.append(listener)
+        return lambda: self._connect_listeners.remove(listener)
+
+    def _connection_lost(self, connection: _KProtocol) -> None:
+        # A connection that was already replaced may still report its close.
+        if connection is not self._connection:
+            return
+        self._connection = None
+        self._closed.set()
+        while self._pending:
+            _command, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError("Connection lost"))
+
+    def _frame_received(self, raw: str) -> None:
+        self._last_activity = asyncio.get_running_loop().time()
+        frame = parse_frame(raw)
+        if frame is None:
+            self.metrics.parse_failures += 1
+            _LOGGER.debug("Ignoring unparsable frame from %s: %s", self.address, raw)
+            return
+        for entry in self._pending:
+            if entry[0].matches(frame):
+                break
         else:
-            command = "zzz"
+            # A bare error names no command; the board answers in order, so
+            # it belongs to the oldest request still waiting.
+            if frame.ok or not self._pending:
+                _LOGGER.debug("Unsolicited frame from %s: %s", self.address, raw)
+                self._push_received(frame)
+                return
+            entry = self._pending[0]
+        self._pending.remove(entry)
+        if not entry[1].done():
+            entry[1].set_result(frame)
 
-        result = self.s.call(command)
-        _LOGGER.debug("request:%s response:%s", command, result)
-        return result
+    def _push_received(self, frame: Frame) -> None:
+        for listener in list(self._listeners):
+            listener(frame)
 
-    def send2KWithLock(self, action_type: str) -> str:
-        with self.s.getLock():
-            result = self.send2K(action_type)
+    def _reset(self) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        if connection.transport is not None:
+            connection.transport.close()
+        self._connection_lost(connection)
+
+    async def call(
+        self,
+        command: Command,
+        priority: Priority = Priority.INTERACTIVE,
+        *,
+        on_sent: Callable[[float], None] | None = None,
+    ) -> Frame:
+        """Send a command and wait for the frame that answers it.
+
+        on_sent is called with the loop time at which the frame is written,
+        after any wait for the connection or the rate limit. It is not
+        called for a command answered by another caller's frame.
+        """
+        if priority is Priority.POLL and (frame := await self._call_poll_link(command)):
+            return frame
+        queued = self._queued.get(command.payload)
+        if queued is not None and priority is Priority.POLL:
+            self.metrics.polls_shared += 1
+            return await asyncio.shield(queued)
+        if self._queue_full(priority):
+            limits = self.limits
+            assert limits is not None
+            if queued is not None and limits.overflow is OverflowPolicy.COALESCE:
+                self.metrics.commands_coalesced += 1
+                return await asyncio.shield(queued)
+            self._overflow(limits.overflow)
+        if queued is not None:
+            return await self._call(command, priority, on_sent)
+
+        shared = self._queued[command.payload] = (
+            asyncio.get_running_loop().create_future()
+        )
+        try:
+            result = await self._call(command, priority, on_sent)
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                exc = ConnectionError("Command was cancelled")
+            shared.set_exception(exc)
+            # Only sharers look at it; don't warn when there are none.
+            shared.exception()
+            raise
+        finally:
+            if self._queued.get(command.payload) is shared:
+                del self._queued[command.payload]
+        shared.set_result(result)
         return result
 
-    def turnOn(self) -> None:
-        result = self.send2KWithLock("on")
-        x = re.match(r"RELAY-SET-\d+,\d+,(\d+),OK", result)
-        if not x or x.group(1) != "1":
-            _LOGGER.warning(
-                "Unexpected turn on response for %s: %s", self.index, result
+    async def _call_poll_link(self, command: Command) -> Frame | None:
+        """Send a poll over the poll link; None if it has to use this one."""
+        link = self._poll_link
+        if link is None or not link.connected:
+            return None
+        try:
+            return await link.call(command, Priority.POLL)
+        except PollDropped:
+            raise
+        except ConnectionError as err:
+            _LOGGER.debug(
+                "Poll link to %s failed (%s), polling on the main link",
+                self.address,
+                err,
             )
+            return None
 
-    def turnOff(self) -> None:
-        result = self.send2KWithLock("off")
-        x = re.match(r"RELAY-SET-\d+,\d+,(\d+),OK", result)
-        if not x or x.group(1) != "0":
-            _LOGGER.warning(
-                "Unexpected turn off response for %s: %s", self.index, result
-            )
+    def _queue_full(self, priority: Priority) -> bool:
+        return (
+            self.limits is not None
+            and priority not in (Priority.TIMED, Priority.BACKGROUND)
+            and self._waiting >= self.limits.queue_size
+        )
+
+    def _overflow(self, policy: OverflowPolicy) -> None:
+        """Make room for a command in a full queue, or turn it away."""
+        if policy is OverflowPolicy.DROP_OLDEST_POLL and self.lock.drop_oldest(
+            Priority.POLL, PollDropped(f"Poll to {self.address[0]} was shed")
+        ):
+            self.metrics.polls_dropped += 1
+            return
+        self.metrics.commands_rejected += 1
+        raise ConnectionError(f"Command queue to {self.address[0]} is full")
+
+    async def _call(
+        self,
+        command: Command,
+        priority: Priority,
+        on_sent: Callable[[float], None] | None = None,
+    ) -> Frame:
+        loop = asyncio.get_running_loop()
+        stats = self.metrics.command(command.kind)
+        queued = loop.time()
+        self.metrics.enqueue()
+        self._waiting += 1
+        try:
+            await self.lock.acquire(priority)
+        finally:
+            self.metrics.dequeue()
+            self._waiting -= 1
+        # The command is about to be sent; later callers need their own.
+        self._queued.pop(command.payload, None)
+        stats.lock_wait.record(loop.time() - queued)
+        try:
+            await self._throttle(priority)
+        except BaseException:
+            self.lock.release()
+            raise
+        started = loop.time()
+        try:
+            result = await self._call_locked(command, on_sent)
+        except TimeoutError as exc:
+            stats.timeouts += 1
+            stats.errors += 1
+            raise ConnectionError("Socket read error") from exc
+        except ConnectionError:
+            stats.errors += 1
+            raise
+        finally:
+            self._release(started)
+        stats.latency.record(loop.time() - started)
+        if not result.ok:
+            stats.errors += 1
+
+        _LOGGER.debug("request:%s response:%s", command.payload, result.raw)
+        return result
 
-    def getStatus(self) -> bool:
-        result = self.send2KWithLock("get")
-        x = re.match(r"RELAY-READ-\d+,\d+,(\d+),OK", result)
-        if not x:
-            raise ValueError(f"Cannot parse status for {self.index}: {result}")
-        return x.group(1) == "1"
+    def _release(self, started: float) -> None:
+        """Hand the connection on, accounting for the turn that ends."""
+        self.metrics.served(asyncio.get_running_loop().time() - started)
+        self.lock.release()
+
+    async def _throttle(self, priority: Priority) -> None:
+        """Wait until the rate limit lets the next command out.
+
+        Timed commands use up a token but never wait for one, so the edges
+        of a pulse keep their timing.
+        """
+        if self._bucket is None:
+            return
+        delay = self._bucket.take(asyncio.get_running_loop().time())
+        if delay and priority is not Priority.TIMED:
+            self.metrics.throttle.record(delay)
+            await asyncio.sleep(delay)
+
+    async def _call_locked(
+        self, command: Command, on_sent: Callable[[float], None] | None = None
+    ) -> Frame:
+        if not self.connected:
+            if self._link_down:
+                raise ConnectionError(
+                    f"{self.address[0]} is unreachable, reconnecting in background"
+                )
+            try:
+                await self._connect()
+            except ConnectionError:
+                # Commands queued behind this one fail at once rather than
+                # each waiting out the connect timeout; the maintain task
+                # clears this when it gets through.
+                self._link_down = self._maintained
+                raise
+        assert self._connection is not None
+        assert self._connection.transport is not None
+
+        future: asyncio.Future[Frame] = asyncio.get_running_loop().create_future()
+        entry = (command, future)
+        self._pending.append(entry)
+        payload = command.encode()
+        try:
+            self._connection.transport.write(payload)
+            self.metrics.bytes_sent += len(payload)
+            if on_sent is not None:
+                on_sent(asyncio.get_running_loop().time())
+            async with asyncio.timeout(DEFAULT_TIMEOUT):
+                return await future
+        except TimeoutError:
+            self._reset()
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                self._pending.remove(entry)
+
+    def close(self) -> None:
+        self._reset()
+        if self._poll_link is not None:
+            self._stop_poll_link()
+            self._poll_link.close()
+
+
+@dataclass
+class _WriteBatch:
+    """Relay writes gathered during one coalescing window."""
+
+    done: asyncio.Future[None]
+    states: dict[int, bool] = field(default_factory=dict)
 
 
 class KinconyClient:
-    """Helper that wraps Kincony calls on the executor."""
+    """Helper that exposes Kincony commands to Home Assistant.
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int) -> None:
+    Relay states the board confirmed (write echoes, reads and reports) are
+    cached with the time they were confirmed. For state_ttl seconds reads
+    are answered from the cache and polls skip those relays; the cache is
+    dropped whenever the connection is reopened, since reports may have
+    been missed while it was down.
+
+    Every confirmed relay mask also feeds stats, the switching statistics
+    of the board.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        channel_count: int = DEFAULT_CHANNEL_COUNT,
+        *,
+        write_window: float = DEFAULT_WRITE_WINDOW,
+        state_ttl: float = STATE_CACHE_TTL,
+        input_count: int = 0,
+        address: int = DEFAULT_ADDRESS,
+        input_reports: bool = True,
+        transport: KTransport | None = None,
+    ) -> None:
         self._hass = hass
         self.host = host
         self.port = port
-        self._transport = KTransport(host, port)
+        self.address = address
+        self.channel_count = channel_count
+        self.input_count = input_count
+        # Input reports carry no address; only one board on a link may
+        # claim them.
+        self._input_reports = input_reports
+        # A transport handed in comes from the shared registry and is
+        # released there; otherwise the client owns its connection.
+        self._shared = transport is not None
+        self._transport = transport or KTransport(host, port)
+        self._write_window = write_window
+        self._write_batch: _WriteBatch | None = None
+        # Last known state of every relay (relay n in bit n-1), None until
+        # the board has been read once.
+        self._relay_mask: int | None = None
+        self._state_ttl = state_ttl
+        # Loop time at which the board last confirmed every relay, and
+        # single relays confirmed since.
+        self._all_confirmed_at = -math.inf
+        self._confirmed_at: dict[int, float] = {}
+        # None until the first bulk request tells us whether the firmware has it.
+        self._bulk_supported: bool | None = None
+        self._set_all_supported: bool | None = None
+        self._inputs_supported: bool | None = None
+        self._input_failures = 0
+        # Raw level of every digital input (input n in bit n-1).
+        self._input_mask: int | None = None
+        self._state_listeners: list[Callable[[dict[int, bool]], None]] = []
+        self._input_listeners: list[Callable[[dict[int, bool]], None]] = []
+        self.stats = RelayStats()
+        self._unsub_report = self._transport.add_listener(self._handle_report)
+        self._unsub_connect = self._transport.add_connect_listener(
+            self._invalidate_states
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._transport.connected
+
+    @property
+    def board_id(self) -> str:
+        """Identify the board; a lone board keeps the plain host."""
+        if self.address == DEFAULT_ADDRESS:
+            return self.host
+        return f"{self.host}-{self.address}"
+
+    @property
+    def metrics(self) -> TransportMetrics:
+        """Instrumentation of the connection this client talks through."""
+        return self._transport.metrics
+
+    @property
+    def bulk_read_supported(self) -> bool | None:
+        """Whether the firmware knows RELAY-STATE; None until tried."""
+        return self._bulk_supported
+
+    @property
+    def bulk_write_supported(self) -> bool | None:
+        """Whether the firmware knows RELAY-SET_ALL; None until tried."""
+        return self._set_all_supported
+
+    @property
+    def inputs_supported(self) -> bool | None:
+        """Whether the firmware answers RELAY-GET_INPUT; None until known."""
+        return self._inputs_supported
+
+    def add_connect_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback for every time the board connection comes up."""
+        return self._transport.add_connect_listener(listener)
+
+    def add_state_listener(
+        self, listener: Callable[[dict[int, bool]], None]
+    ) -> Callable[[], None]:
+        """Register a callback for relay states pushed by the board."""
+        self._state_listeners.append(listener)
+        return lambda: self._state_listeners.remove(listener)
+
+    def add_input_listener(
+        self, listener: Callable[[dict[int, bool]], None]
+    ) -> Callable[[], None]:
+        """Register a callback for digital input changes pushed by the board."""
+        self._input_listeners.append(listener)
+        return lambda: self._input_listeners.remove(listener)
+
+    @callback
+    def _handle_report(self, frame: Frame) -> None:
+        try:
+            mask = apply_relay_report(frame, self._relay_mask, self.address)
+            inputs = None
+            if self.input_count and (self._input_reports or frame.kind == "GET_INPUT"):
+                inputs = apply_input_report(frame, self._input_mask, self.address)
+        except ProtocolError as err:
+            self.metrics.parse_failures += 1
+            _LOGGER.debug("Ignoring report from %s: %s", self.host, err)
+            return
+        if inputs is not None:
+            self._input_mask = inputs
+            states = self._inputs_from_mask(inputs)
+            for listener in list(self._input_listeners):
+                listener(states)
+        if mask is None:
+            return
+        self._relay_mask = mask
+        if frame.kind in ("STATE", "SET_ALL"):
+            self._confirm()
+        else:
+            self._confirm((int(frame.args[1]),))
+        self._notify_states()
+
+    def _notify_states(self) -> None:
+        if self._relay_mask is None:
+            return
+        states = self._states_from_mask(self._relay_mask)
+        for listener in list(self._state_listeners):
+            listener(states)
 
     async def async_turn_on(self, channel: int) -> None:
-        connection = KConnection(self._transport, str(channel))
-        await self._hass.async_add_executor_job(connection.turnOn)
+        await self._async_set(channel, True)
 
     async def async_turn_off(self, channel: int) -> None:
-        connection = KConnection(self._transport, str(channel))
-        await self._hass.async_add_executor_job(connection.turnOff)
+        await self._async_set(channel, False)
+
+    async def async_pulse(self, channel: int, duration: float) -> float:
+        """Switch a relay on for duration seconds and return the width achieved.
+
+        Both edges skip the write window and go out ahead of any other
+        command. The board confirms each edge, and the width is measured
+        between the two confirmations. The off edge is therefore sent one
+        on-edge round trip early, so link latency cancels out instead of
+        stretching the pulse. The round trip is counted from the moment the
+        on edge is written, so waiting behind a command already on the wire
+        does not shorten the pulse. The off edge is sent even if the pulse
+        is cancelled.
+        """
+        loop = self._hass.loop
+        sent: list[float] = []
+        await self._async_write_one(channel, True, Priority.TIMED, sent.append)
+        on_at = loop.time()
+        self._notify_states()
+        try:
+            await asyncio.sleep(max(0.0, duration - (on_at - sent[0])))
+        finally:
+            await self._async_write_one(channel, False, Priority.TIMED)
+            self._notify_states()
+        return loop.time() - on_at
+
+    async def async_set_relays(self, states: dict[int, bool]) -> dict[int, bool]:
+        """Switch several relays at once and return the state of every relay.
+
+        The relays go out in one RELAY-SET_ALL frame. Relays that are not
+        listed keep their state, so the board is read first unless their
+        state was confirmed within the cache TTL.
+        """
+        if self._relay_mask is None:
+            await self._async_read_states(Priority.INTERACTIVE)
+        await self._async_set_many(states)
+        assert self._relay_mask is not None
+        return self._states_from_mask(self._relay_mask)
+
+    async def _async_set(self, channel: int, state: bool) -> None:
+        await self._async_set_many({channel: state})
+
+    async def _async_set_many(self, states: dict[int, bool]) -> None:
+        """Queue relay writes and wait until the batch carrying them is sent.
+
+        Writes arriving within the coalescing window go out together; a later
+        write for the same relay replaces the earlier one.
+        """
+        batch = self._write_batch
+        if batch is None:
+            batch = self._write_batch = _WriteBatch(self._hass.loop.create_future())
+            self._hass.async_create_background_task(
+                self._async_flush_writes(batch), f"{DOMAIN} {self.host} relay writes"
+            )
+        batch.states.update(states)
+        await asyncio.shield(batch.done)
+
+    async def _async_flush_writes(self, batch: _WriteBatch) -> None:
+        try:
+            await asyncio.sleep(self._write_window)
+            self._write_batch = None
+            await self._async_write(batch.states)
+        except Exception as exc:
+            batch.done.set_exception(exc)
+        else:
+            batch.done.set_result(None)
+        finally:
+            if self._write_batch is batch:
+                self._write_batch = None
+            if not batch.done.done():
+                batch.done.cancel()
+
+    async def _async_write(self, states: dict[int, bool]) -> None:
+        """Send a batch of relay writes, as one RELAY-SET_ALL when possible.
+
+        RELAY-SET_ALL also sets every relay outside the batch, so it is only
+        sent while those are fresh. Otherwise the board is read first, so a
+        relay switched elsewhere since the last read is not switched back.
+        """
+        if len(states) > 1 and self._set_all_supported is not False:
+            current = self._fresh_except(states)
+            if not current and self._bulk_supported is not False:
+                await self._async_read_states(Priority.INTERACTIVE)
+                current = True
+            if current and await self._async_write_all(states):
+                return
+
+        for channel, state in states.items():
+            await self._async_write_one(channel, state)
+
+    def _fresh_except(self, channels: Iterable[int]) -> bool:
+        """Whether every relay but these is known from a fresh confirmation."""
+        now = self._hass.loop.time()
+        skip = set(channels)
+        return all(
+            self._is_fresh(channel, now)
+            for channel in range(1, self.channel_count + 1)
+            if channel not in skip
+        )
+
+    async def _async_write_all(self, states: dict[int, bool]) -> bool:
+        """Send the batch as one RELAY-SET_ALL; False if the firmware lacks it."""
+        assert self._relay_mask is not None
+        mask = self._relay_mask
+        for channel, state in states.items():
+            bit = 1 << (channel - 1)
+            mask = mask | bit if state else mask & ~bit
+        frame = await self._transport.call(
+            relay_set_all(self.address, mask, self.channel_count)
+        )
+        try:
+            confirmed = parse_relay_set_all(frame)
+        except ProtocolError:
+            if self._set_all_supported:
+                raise
+            _LOGGER.info(
+                "%s does not support bulk relay writes, switching per channel",
+                self.host,
+            )
+            self._set_all_supported = False
+            return False
+        self._set_all_supported = True
+        self._relay_mask = confirmed
+        self._confirm()
+        if confirmed != mask:
+            _LOGGER.warning(
+                "Unexpected set all response for %s: %s", self.host, frame.raw
+            )
+        return True
+
+    async def _async_write_one(
+        self,
+        channel: int,
+        state: bool,
+        priority: Priority = Priority.INTERACTIVE,
+        on_sent: Callable[[float], None] | None = None,
+    ) -> None:
+        frame = await self._transport.call(
+            relay_set(self.address, channel, state), priority, on_sent=on_sent
+        )
+        try:
+            confirmed = parse_relay_set(frame)
+        except ProtocolError:
+            self.metrics.parse_failures += 1
+            confirmed = None
+        if confirmed is not state:
+            _LOGGER.warning(
+                "Unexpected turn %s response for %s: %s",
+                "on" if state else "off",
+                channel,
+                frame.raw,
+            )
+        if confirmed is not None:
+            self._update_channel(channel, confirmed)
+
+    def _update_channel(self, channel: int, state: bool) -> None:
+        if self._relay_mask is None:
+            return
+        bit = 1 << (channel - 1)
+        self._relay_mask = self._relay_mask | bit if state else self._relay_mask & ~bit
+        self._confirm((channel,))
+
+    def _confirm(self, channels: Iterable[int] | None = None) -> None:
+        """Record that the board just confirmed these relays (default: all)."""
+        now = self._hass.loop.time()
+        if self._relay_mask is not None:
+            self.stats.observe(self._relay_mask, now)
+        if channels is None:
+            self._all_confirmed_at = now
+            self._confirmed_at.clear()
+            return
+        for channel in channels:
+            self._confirmed_at[channel] = now
+
+    def _is_fresh(self, channel: int, now: float) -> bool:
+        if self._relay_mask is None:
+            return False
+        confirmed_at = max(
+            self._all_confirmed_at, self._confirmed_at.get(channel, -math.inf)
+        )
+        return now - confirmed_at < self._state_ttl
+
+    @callback
+    def _invalidate_states(self) -> None:
+        self._all_confirmed_at = -math.inf
+        self._confirmed_at.clear()
 
     async def async_get_status(self, channel: int) -> bool:
-        connection = KConnection(self._transport, str(channel))
-        return await self._hass.async_add_executor_job(connection.getStatus)
+        """Return one relay, from the cache while its state is fresh."""
+        if self._is_fresh(channel, self._hass.loop.time()):
+            assert self._relay_mask is not None
+            return bool(self._relay_mask >> (channel - 1) & 1)
+        return await self._async_read_channel(channel, Priority.POLL)
+
+    async def _async_read_channel(self, channel: int, priority: Priority) -> bool:
+        frame = await self._transport.call(relay_read(self.address, channel), priority)
+        state = parse_relay_read(frame)
+        self._update_channel(channel, state)
+        return state
+
+    async def async_get_states(self) -> dict[int, bool]:
+        """Read all relays, preferring a single bulk RELAY-STATE request.
+
+        Older firmware does not know RELAY-STATE; once that is detected the
+        client falls back to reading each channel on its own. Relays confirmed
+        within the cache TTL are not read again, and a poll shed under load
+        is answered with the last known states.
+        """
+        try:
+            return await self._async_read_states()
+        except PollDropped:
+            if self._relay_mask is None:
+                raise
+            return self._states_from_mask(self._relay_mask)
+
+    async def _async_read_states(
+        self, priority: Priority = Priority.POLL
+    ) -> dict[int, bool]:
+        now = self._hass.loop.time()
+        channels = range(1, self.channel_count + 1)
+        if all(self._is_fresh(channel, now) for channel in channels):
+            assert self._relay_mask is not None
+            return self._states_from_mask(self._relay_mask)
+
+        if self._bulk_supported is not False:
+            frame = await self._transport.call(relay_state(self.address), priority)
+            try:
+                mask = parse_relay_state(frame)
+            except ProtocolError:
+                if self._bulk_supported:
+                    raise
+                _LOGGER.info(
+                    "%s does not support bulk relay reads, polling per channel",
+                    self.host,
+                )
+                self._bulk_supported = False
+            else:
+                self._bulk_supported = True
+                self._relay_mask = mask
+                self._confirm()
+                return self._states_from_mask(mask)
+
+        return self._states_from_mask(await self._async_read_channels(now, priority))
+
+    async def _async_read_channels(self, now: float, priority: Priority) -> int:
+        """Read the relays that are not fresh one at a time."""
+        if self._relay_mask is None:
+            mask = 0
+            for channel in range(1, self.channel_count + 1):
+                if await self._async_read_channel(channel, priority):
+                    mask |= 1 << (channel - 1)
+            self._relay_mask = mask
+            self._confirm()
+            return mask
+        for channel in range(1, self.channel_count + 1):
+            if not self._is_fresh(channel, now):
+                await self._async_read_channel(channel, priority)
+        return self._relay_mask
+
+    def _states_from_mask(self, mask: int) -> dict[int, bool]:
+        return {
+            channel: bool(mask >> (channel - 1) & 1)
+            for channel in range(1, self.channel_count + 1)
+        }
+
+    async def async_get_inputs(self) -> dict[int, bool] | None:
+        """Read every digital input with one RELAY-GET_INPUT request.
+
+        Returns None when no inputs are configured or the firmware does not
+        know the command. Firmware that never answers it is given up on
+        after INPUT_READ_ATTEMPTS failed reads, since every read that times
+        out also resets the connection.
+        """
+        if not self.input_count or self._inputs_supported is False:
+            return None
+        try:
+            frame = await self._transport.call(
+                relay_get_input(self.address), Priority.POLL
+            )
+        except PollDropped:
+            if self._input_mask is None:
+                raise
+            return self._inputs_from_mask(self._input_mask)
+        except ConnectionError:
+            if self._inputs_supported is None:
+                self._input_failures += 1
+                if self._input_failures >= INPUT_READ_ATTEMPTS:
+                    _LOGGER.info("%s does not answer input reads", self.host)
+                    self._inputs_supported = False
+            raise
+        try:
+            mask = parse_relay_get_input(frame)
+        except ProtocolError:
+            if self._inputs_supported:
+                raise
+            _LOGGER.info("%s does not support reading inputs", self.host)
+            self._inputs_supported = False
+            return None
+        self._inputs_supported = True
+        self._input_mask = mask
+        return self._inputs_from_mask(mask)
+
+    def _inputs_from_mask(self, mask: int) -> dict[int, bool]:
+        # A cleared bit is a closed, active input.
+        return {
+            channel: not mask >> (channel - 1) & 1
+            for channel in range(1, self.input_count + 1)
+        }
 
     async def async_ping(self) -> None:
-        connection = KConnection(self._transport, "1")
-        await self._hass.async_add_executor_job(connection.send2KWithLock, "test")
+        await self._transport.call(relay_test())
 
     async def async_get_channel_count(self) -> int | None:
         """Try to read channel count via scan command."""
-
-        def _scan() -> int | None:
-            connection = KConnection(self._transport, "1")
-            result = connection.send2KWithLock("scan")
-            match = re.match(r"RELAY-SCAN_DEVICE-CHANNEL_(\d+),OK", result)
-            if match:
-                return int(match.group(1))
+        frame = await self._transport.call(relay_scan())
+        try:
+            return parse_channel_count(frame)
+        except ProtocolError:
             return None
 
-        return await self._hass.async_add_executor_job(_scan)
-
     def close(self) -> None:
-        """Close the underlying transport."""
-        self._transport.close()
+        """Close the underlying transport, or release it if it is shared."""
+        self._unsub_report()
+        self._unsub_connect()
+        if self._shared:
+            release_transport(self._hass, self._transport)
+        else:
+            self._transport.close()
+
+
+@dataclass
+class _SharedTransport:
+    """A transport shared by every user of one board, with its user count."""
+
+    transport: KTransport
+    users: int = 0
+    task: asyncio.Task[None] | None = None
+    cancel_close: CALLBACK_TYPE | None = None
+
+
+def _connections(hass: HomeAssistant) -> dict[tuple[str, int], _SharedTransport]:
+    return hass.data.setdefault(DOMAIN, {}).setdefault(DATA_CONNECTIONS, {})
+
+
+@callback
+def acquire_transport(
+    hass: HomeAssistant,
+    host: str,
+    port: int,
+    limits: TransportLimits | None = None,
+    split: bool | None = None,
+) -> KTransport:
+    """Return the shared transport for a board without waiting for it.
+
+    Many KC868 firmwares accept only a few TCP clients, so the config flow,
+    every config entry and reloads all share one connection per board. The
+    connection is opened and kept up in the background while anyone holds
+    it, and stays open briefly after the last release so a flow handing
+    over to setup or a reload reuses it. Limits and the choice of a
+    separate poll link given here replace those of the connection.
+    """
+    connections = _connections(hass)
+    shared = connections.get((host, port))
+    if shared is None:
+        shared = connections[(host, port)] = _SharedTransport(KTransport(host, port))
+    if limits is not None:
+        shared.transport.set_limits(limits)
+    if split is not None:
+        shared.transport.set_poll_link(split)
+    shared.users += 1
+    if shared.cancel_close is not None:
+        shared.cancel_close()
+        shared.cancel_close = None
+    if shared.task is None:
+        shared.task = hass.async_create_background_task(
+            shared.transport.async_maintain(), f"{DOMAIN} {host} connection"
+        )
+    return shared.transport
+
+
+async def async_acquire_transport(
+    hass: HomeAssistant, host: str, port: int
+) -> KTransport:
+    """Return the shared transport for a board once it is connected."""
+    transport = acquire_transport(hass, host, port)
+    try:
+        await transport.async_connect()
+    except ConnectionError:
+        release_transport(hass, transport)
+        raise
+    return transport
+
+
+@callback
+def release_transport(hass: HomeAssistant, transport: KTransport) -> None:
+    """Drop one user of a shared transport and close it after the last one."""
+    connections = _connections(hass)
+    shared = connections.get(transport.address)
+    if shared is None or shared.transport is not transport:
+        transport.close()
+        return
+    shared.users -= 1
+    if shared.users > 0:
+        return
+
+    @callback
+    def _close(_now: datetime | None = None) -> None:
+        if connections.get(transport.address) is shared and shared.users == 0:
+            del connections[transport.address]
+            if shared.task is not None:
+                shared.task.cancel()
+            transport.close()
+
+    if not transport.connected:
+        _close()
+        return
+    shared.cancel_close = async_call_later(hass, CONNECTION_LINGER, _close)
+
+
+async def async_get_client(
+    hass: HomeAssistant,
+    host: str,
+    port: int,
+    channel_count: int = DEFAULT_CHANNEL_COUNT,
+) -> KinconyClient:
+    """Return a client on the shared connection to a board."""
+    transport = await async_acquire_transport(hass, host, port)
+    return KinconyClient(hass, host, port, channel_count, transport=transport)
 
 
 async def async_setup(hass: HomeAssistant, _config: dict[str, Any]) -> bool:
     """Set up the Kincony integration (config entries only)."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Kincony from a config entry."""
+    """Set up Kincony from a config entry.
+
+    Setup does no board I/O: entities are created from the stored channel count and
+    stay unavailable until the first bulk read, which runs as soon as the
+    connection comes up in the background. Boards that are slow or rebooting
+    therefore never hold up Home Assistant startup, and several boards
+    connect in parallel.
+
+    An entry can serve several boards chained behind one gateway, one
+    coordinator per address. They share the gateway's connection, where
+    their polls queue in arrival order and so take turns.
+    """
     hass.data.setdefault(DOMAIN, {})
 
+    addresses: list[int] = entry.options.get(CONF_ADDRESSES, [DEFAULT_ADDRESS])
+    coordinators = hass.data[DOMAIN][entry.entry_id] = {
+        address: _async_setup_board(hass, entry, address, len(addresses) == 1)
+        for address in addresses
+    }
+    await _async_setup_stats(hass, entry, coordinators)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    return True
+
+
+@callback
+def _async_setup_board(
+    hass: HomeAssistant, entry: ConfigEntry, address: int, only_board: bool
+) -> KinconyCoordinator:
     host = entry.data[CONF_HOST]
     port = entry.data.get(CONF_PORT, DEFAULT_PORT)
-    client = KinconyClient(hass, host, port)
+    channel_count: int = entry.options.get(
+        CONF_CHANNEL_COUNT, entry.data.get(CONF_CHANNEL_COUNT, DEFAULT_CHANNEL_COUNT)
+    )
+    input_count: int = entry.options.get(CONF_INPUT_COUNT, DEFAULT_INPUT_COUNT)
+    limits = TransportLimits(
+        rate=entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+        burst=entry.options.get(CONF_BURST, DEFAULT_BURST),
+        queue_size=entry.options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE),
+        overflow=OverflowPolicy(
+            entry.options.get(CONF_OVERFLOW_POLICY, DEFAULT_OVERFLOW_POLICY)
+        ),
+    )
+    client = KinconyClient(
+        hass,
+        host,
+        port,
+        channel_count,
+        input_count=input_count,
+        address=address,
+        input_reports=only_board,
+        transport=acquire_transport(
+            hass,
+            host,
+            port,
+            limits,
+            entry.options.get(CONF_SPLIT_CONNECTIONS, False),
+        ),
+    )
+    coordinator = KinconyCoordinator(hass, entry, client)
+    entry.async_on_unload(client.close)
 
-    try:
-        await client.async_ping()
-    except Exception as exc:
-        raise ConfigEntryNotReady from exc
+    @callback
+    def _refresh() -> None:
+        # Relays may have changed while the link was down and their
+        # reports were missed, so every (re)connect triggers a full read.
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_request_refresh(),
+            f"{DOMAIN} {client.board_id} refresh",
+        )
+
+    entry.async_on_unload(client.add_connect_listener(_refresh))
+    entry.async_on_unload(client.add_state_listener(coordinator.async_set_updated_data))
+    entry.async_on_unload(client.add_input_listener(coordinator.async_set_inputs))
+    if client.connected:
+        _refresh()
+    return coordinator
 
-    hass.data[DOMAIN][entry.entry_id] = client
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    return True
+
+def _stats_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    return Store(hass, STATS_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.stats")
+
+
+async def _async_setup_stats(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinators: dict[int, KinconyCoordinator],
+) -> None:
+    """Restore the switching statistics of every board and keep them saved."""
+    store = _stats_store(hass, entry)
+    saved = await store.async_load() or {}
+    clients = [coordinator.client for coordinator in coordinators.values()]
+
+    @callback
+    def _data() -> dict[str, Any]:
+        now = hass.loop.time()
+        return {client.board_id: client.stats.as_dict(now) for client in clients}
+
+    @callback
+    def _schedule_save() -> None:
+        store.async_delay_save(_data, STATS_SAVE_DELAY)
+
+    async def _async_save() -> None:
+        # A delayed save cannot be brought forward, so save now on unload.
+        await store.async_save(_data())
+
+    for client in clients:
+        client.stats = RelayStats.from_dict(saved.get(client.board_id))
+        client.stats.on_change = _schedule_save
+    entry.async_on_unload(_async_save)
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry so changed options take effect."""
+    await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    client: KinconyClient | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        if client:
-            client.close()
         hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the saved switching statistics of a removed entry."""
+    await _stats_store(hass, entry).async_remove()
@@ -0,0 +1,45 @@
+"""Binary sensor platform for Kincony SHA digital inputs."""
+
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import KinconyCoordinator
+from .entity import KinconyEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up Kincony digital inputs from a config entry."""
+    coordinators: dict[int, KinconyCoordinator] = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        KinconyInput(coordinator=coordinator, channel=index)
+        for coordinator in coordinators.values()
+        for index in range(1, coordinator.client.input_count + 1)
+    )
+
+
+class KinconyInput(KinconyEntity, BinarySensorEntity):
+    """A digital input of a Kincony board, on while the input is closed."""
+
+    def __init__(self, coordinator: KinconyCoordinator, channel: int) -> None:
+        super().__init__(coordinator)
+        self._channel = channel
+        self._attr_name = f"Input {channel}"
+        self._attr_unique_id = f"{coordinator.client.board_id}-input-{channel}"
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.coordinator.inputs is not None
+
+    @property
+    def is_on(self) -> bool | None:
+        if self.coordinator.inputs is None:
+            return None
+        return self.coordinator.inputs.get(self._channel)
@@ -9,12 +9,37 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import discovery_flow
 
-from . import KinconyClient
-from .const import CONF_CHANNEL_COUNT, DEFAULT_CHANNEL_COUNT, DEFAULT_PORT, DOMAIN
+from . import OverflowPolicy, async_get_client
+from .const import (
+    CONF_ADDRESSES,
+    CONF_BURST,
+    CONF_CHANNEL_COUNT,
+    CONF_INPUT_COUNT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_OVERFLOW_POLICY,
+    CONF_QUEUE_SIZE,
+    CONF_RATE_LIMIT,
+    CONF_SPLIT_CONNECTIONS,
+    DEFAULT_BURST,
+    DEFAULT_CHANNEL_COUNT,
+    DEFAULT_INPUT_COUNT,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_OVERFLOW_POLICY,
+    DEFAULT_PORT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .discovery import DiscoveredBoard, async_discover, parse_host_range
+from .protocol import DEFAULT_ADDRESS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,12 +51,31 @@ class KinconyConfigFlow(
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: ConfigEntry,
+    ) -> KinconyOptionsFlowHandler:
+        """Return the options flow handler."""
+        return KinconyOptionsFlowHandler()
+
+    def __init__(self) -> None:
+        self._port = DEFAULT_PORT
+        self._discovered: dict[str, DiscoveredBoard] = {}
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
+        """Add one board by address, or scan a subnet or range for boards."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
+            try:
+                hosts = parse_host_range(user_input[CONF_HOST])
+            except ValueError:
+                return self._async_show_user_form({CONF_HOST: "invalid_range"})
+            if hosts is not None:
+                return await self._async_scan(hosts, user_input[CONF_PORT])
             try:
                 info = await async_validate_input(self.hass, user_input)
             except CannotConnect:
@@ -52,6 +96,10 @@ class KinconyConfigFlow(
                     },
                 )
 
+        return self._async_show_user_form(errors)
+
+    @callback
+    def _async_show_user_form(self, errors: dict[str, str]) -> FlowResult:
         data_schema = vol.Schema(
             {
                 vol.Required(CONF_HOST): str,
@@ -66,6 +114,94 @@ class KinconyConfigFlow(
             errors=errors,
         )
 
+    async def _async_scan(self, hosts: list[str], port: int) -> FlowResult:
+        """Probe the hosts and offer the boards that are not set up yet."""
+        configured = self._async_current_ids()
+        boards = await async_discover(
+            [host for host in hosts if host not in configured], port
+        )
+        if not boards:
+            return self._async_show_user_form({"base": "no_boards_found"})
+        self._port = port
+        self._discovered = {board.host: board for board in boards}
+        return await self.async_step_pick()
+
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose which of the discovered boards to add."""
+        errors: dict[str, str] = {}
+        if user_input is not None and not user_input[CONF_HOST]:
+            errors["base"] = "no_boards_selected"
+        elif user_input is not None:
+            first, *others = user_input[CONF_HOST]
+            for host in others:
+                # Every further board gets a flow of its own, shown as
+                # discovered and added with one click.
+                discovery_flow.async_create_flow(
+                    self.hass,
+                    DOMAIN,
+                    {"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                    self._entry_data(self._discovered[host]),
+                )
+            await self.async_set_unique_id(first)
+            self._abort_if_unique_id_configured()
+            return self.async_create_entry(
+                title=first, data=self._entry_data(self._discovered[first])
+            )
+
+        boards = {
+            host: f"{host} ({board.channel_count or '?'} relays)"
+            for host, board in sorted(self._discovered.items())
+        }
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_HOST, default=list(boards)): cv.multi_select(boards)}
+            ),
+            description_placeholders={"count": str(len(boards))},
+            errors=errors,
+        )
+
+    def _entry_data(self, board: DiscoveredBoard) -> dict[str, Any]:
+        return {
+            CONF_HOST: board.host,
+            CONF_PORT: self._port,
+            CONF_CHANNEL_COUNT: board.channel_count or DEFAULT_CHANNEL_COUNT,
+        }
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Handle a board found by a scan in another flow."""
+        await self.async_set_unique_id(discovery_info[CONF_HOST])
+        self._abort_if_unique_id_configured()
+        self._discovered = {
+            discovery_info[CONF_HOST]: DiscoveredBoard(
+                discovery_info[CONF_HOST], discovery_info[CONF_CHANNEL_COUNT]
+            )
+        }
+        self._port = discovery_info[CONF_PORT]
+        self.context["title_placeholders"] = {"host": discovery_info[CONF_HOST]}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm adding a discovered board."""
+        board = next(iter(self._discovered.values()))
+        if user_input is not None:
+            return self.async_create_entry(
+                title=board.host, data=self._entry_data(board)
+            )
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            description_placeholders={
+                "host": board.host,
+                "channel_count": str(board.channel_count or DEFAULT_CHANNEL_COUNT),
+            },
+        )
+
     async def async_step_import(self, user_input: dict[str, Any]) -> FlowResult:
         """Handle import from YAML."""
         return await self.async_step_user(user_input)
@@ -78,7 +214,10 @@ async def async_validate_input(
     """Validate the user input allows us to connect."""
     host: str = str(data[CONF_HOST])
     port: int = int(data[CONF_PORT])
-    client = KinconyClient(hass, host, port)
+    try:
+        client = await async_get_client(hass, host, port)
+    except ConnectionError as exc:
+        raise CannotConnect from exc
 
     channel_count: int | None = None
     try:
@@ -89,6 +228,8 @@ async def async_validate_input(
             await client.async_ping()
         except Exception as exc2:
             raise CannotConnect from exc2
+    finally:
+        client.close()
 
     if channel_count is None:
         channel_count = DEFAULT_CHANNEL_COUNT
@@ -103,20 +244,27 @@ class CannotConnect(HomeAssistantError):
 class KinconyOptionsFlowHandler(config_entries.OptionsFlow):
     """Options flow to tweak relay exposure."""
 
-    def __init__(self, config_entry: ConfigEntry) -> None:
-        self.config_entry = config_entry
-
     async def async_step_init(
-        self, user_input: dict[str, int] | None = None
+        self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
+        errors: dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(
-                title="",
-                data={
-                    CONF_CHANNEL_COUNT: user_input[CONF_CHANNEL_COUNT],
-                },
-            )
+            options = dict(user_input)
+            try:
+                options[CONF_ADDRESSES] = parse_addresses(
+                    user_input.get(CONF_ADDRESSES, str(DEFAULT_ADDRESS))
+                )
+            except ValueError:
+                errors[CONF_ADDRESSES] = "invalid_addresses"
+            if options.get(
+                CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+            ) > options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL):
+                errors[CONF_MIN_SCAN_INTERVAL] = "invalid_scan_interval"
+            if not errors:
+                return self.async_create_entry(title="", data=options)
 
+        options = self.config_entry.options
+        addresses = options.get(CONF_ADDRESSES, [DEFAULT_ADDRESS])
         current_count = self.config_entry.options.get(
             CONF_CHANNEL_COUNT,
             self.config_entry.data.get(CONF_CHANNEL_COUNT, DEFAULT_CHANNEL_COUNT),
@@ -128,13 +276,64 @@ class KinconyOptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Required(CONF_CHANNEL_COUNT, default=current_count): vol.All(
                         vol.Coerce(int), vol.Range(min=1, max=32)
                     ),
+                    vol.Required(
+                        CONF_INPUT_COUNT,
+                        default=self.config_entry.options.get(
+                            CONF_INPUT_COUNT, DEFAULT_INPUT_COUNT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=32)),
+                    vol.Required(
+                        CONF_MIN_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Required(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Required(
+                        CONF_ADDRESSES,
+                        default=", ".join(str(address) for address in addresses),
+                    ): str,
+                    vol.Required(
+                        CONF_RATE_LIMIT,
+                        default=options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=1000)),
+                    vol.Required(
+                        CONF_BURST, default=options.get(CONF_BURST, DEFAULT_BURST)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                    vol.Required(
+                        CONF_QUEUE_SIZE,
+                        default=options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                    vol.Required(
+                        CONF_OVERFLOW_POLICY,
+                        default=options.get(
+                            CONF_OVERFLOW_POLICY, DEFAULT_OVERFLOW_POLICY
+                        ),
+                    ): vol.In([policy.value for policy in OverflowPolicy]),
+                    vol.Required(
+                        CONF_SPLIT_CONNECTIONS,
+                        default=options.get(CONF_SPLIT_CONNECTIONS, False),
+                    ): bool,
                 }
             ),
+            errors=errors,
         )
 
 
-async def async_get_options_flow(
-    config_entry: ConfigEntry,
-) -> KinconyOptionsFlowHandler:
-    """Return the options flow handler."""
-    return KinconyOptionsFlowHandler(config_entry)
+def parse_addresses(value: str) -> list[int]:
+    """Parse a comma separated list of board addresses (1-255)."""
+    addresses: list[int] = []
+    for part in value.split(","):
+        address = int(part.strip())
+        if not 1 <= address <= DEFAULT_ADDRESS:
+            raise ValueError(f"Address {address} is out of range")
+        if address not in addresses:
+            addresses.append(address)
+    if not addresses:
+        raise ValueError("No address given")
+    return addresses
@@ -4,7 +4,69 @@ from homeassistant.const import Platform
 
 DOMAIN = "kincony_kc868_tcp"
 DEFAULT_PORT = 4196
+DEFAULT_TIMEOUT = 5
 DEFAULT_CHANNEL_COUNT = 32
 CONF_CHANNEL_COUNT = "channel_count"
+DEFAULT_INPUT_COUNT = 8
+CONF_INPUT_COUNT = "input_count"
+# Failed input reads, before one ever worked, after which they are given up.
+INPUT_READ_ATTEMPTS = 3
+# Addresses (kcodes) of the boards served by one entry.
+CONF_ADDRESSES = "addresses"
 
-PLATFORMS = [Platform.SWITCH]
+# Discovery probes: how many run at once, seconds each may take to connect
+# and answer, and the largest range the config flow will scan.
+DISCOVERY_CONCURRENCY = 64
+DISCOVERY_TIMEOUT = 1.5
+MAX_DISCOVERY_HOSTS = 1024
+
+# Key in hass.data[DOMAIN] holding the shared per-board connections.
+DATA_CONNECTIONS = "connections"
+# Seconds a shared connection stays open after its last user releases it.
+CONNECTION_LINGER = 30
+# The board pushes relay changes, so polling is only a safety net. Polls
+# run every min seconds after a change and back off to max when quiet.
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = 15
+DEFAULT_SCAN_INTERVAL = 300
+# Fraction by which each poll interval is randomly stretched or shortened
+# so boards do not poll in lockstep.
+SCAN_INTERVAL_JITTER = 0.1
+# Backoff bounds in seconds for reopening a dropped connection.
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+# Seconds of silence after which the link is probed with RELAY-TEST-NOW.
+KEEPALIVE_INTERVAL = 30
+# Seconds a relay state confirmed by the board is trusted without a new read.
+STATE_CACHE_TTL = 10
+# Seconds to gather relay writes into a single RELAY-SET_ALL frame.
+DEFAULT_WRITE_WINDOW = 0.05
+# Cheap firmware drops replies when driven too hard: commands per second
+# after a burst, how many commands may wait for the connection, and what
+# happens to a command that finds the queue full.
+CONF_RATE_LIMIT = "rate_limit"
+CONF_BURST = "burst"
+CONF_QUEUE_SIZE = "queue_size"
+CONF_OVERFLOW_POLICY = "overflow_policy"
+DEFAULT_RATE_LIMIT = 20
+DEFAULT_BURST = 10
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_OVERFLOW_POLICY = "drop_oldest_poll"
+# Poll over a second connection, for firmware that accepts several clients.
+CONF_SPLIT_CONNECTIONS = "split_connections"
+
+# Relay switching statistics are saved per entry, at most this often.
+STATS_STORAGE_VERSION = 1
+STATS_SAVE_DELAY = 300
+
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.SWITCH]
+
+SERVICE_SET_RELAYS = "set_relays"
+SERVICE_PULSE = "pulse"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ADDRESS = "address"
+ATTR_RELAYS = "relays"
+ATTR_MASK = "mask"
+ATTR_RELAY = "relay"
+ATTR_DURATION = "duration"
@@ -0,0 +1,134 @@
+"""Data update coordinator for Kincony SHA."""
+
+from __future__ import annotations
+
+import logging
+import random
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    SCAN_INTERVAL_JITTER,
+)
+
+if TYPE_CHECKING:
+    from . import KinconyClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KinconyCoordinator(DataUpdateCoordinator[dict[int, bool]]):
+    """Poll every relay of one board and fan the states out to the switches.
+
+    The digital inputs are read in the same cycle and kept in inputs, so
+    relays and inputs of a board share one connection and one schedule. A
+    failed input read only makes the inputs unavailable; the relay states
+    of the cycle are kept.
+
+    The poll interval adapts to the board: it drops to the minimum after a
+    write, a pushed report or a poll that found a change, and doubles with
+    every quiet poll up to the maximum. Each interval gets some jitter.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: KinconyClient,
+    ) -> None:
+        self._min_interval: float = entry.options.get(
+            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+        )
+        self._max_interval: float = entry.options.get(
+            CONF_MAX_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+        )
+        # Current interval before jitter.
+        self._interval = self._max_interval
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} {client.board_id}",
+            update_interval=self._jittered(self._interval),
+        )
+        self.client = client
+        # Seconds the last poll of the board took, None before the first one.
+        self.last_poll_duration: float | None = None
+        # Digital input states, None until read or if the board has none.
+        self.inputs: dict[int, bool] | None = None
+
+    @property
+    def channel_count(self) -> int:
+        return self.client.channel_count
+
+    async def _async_update_data(self) -> dict[int, bool]:
+        started = self.hass.loop.time()
+        try:
+            try:
+                states = await self.client.async_get_states()
+            except Exception as err:
+                raise UpdateFailed(
+                    f"Failed to poll {self.client.board_id}: {err}"
+                ) from err
+            inputs = await self._async_get_inputs()
+        finally:
+            self.last_poll_duration = self.hass.loop.time() - started
+        changed = (self.data is not None and states != self.data) or (
+            inputs is not None and self.inputs is not None and inputs != self.inputs
+        )
+        self.inputs = inputs
+        self._set_interval(
+            self._min_interval if changed else self._interval * 2
+        )
+        return states
+
+    async def _async_get_inputs(self) -> dict[int, bool] | None:
+        try:
+            return await self.client.async_get_inputs()
+        except Exception as err:
+            _LOGGER.debug(
+                "Failed to read inputs of %s: %s", self.client.board_id, err
+            )
+            return None
+
+    @callback
+    def async_set_updated_data(self, data: dict[int, bool]) -> None:
+        """Apply relay states from a write or a report and poll soon again."""
+        self._set_interval(self._min_interval)
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_set_inputs(self, inputs: dict[int, bool]) -> None:
+        """Apply input states pushed by the board."""
+        self.inputs = inputs
+        self.async_note_activity()
+        self.async_update_listeners()
+
+    @callback
+    def async_note_activity(self) -> None:
+        """Switch to the fast poll rate after a write or an external change."""
+        self._set_interval(self._min_interval)
+        if self._listeners:
+            # A new update_interval only applies from the next scheduled
+            # poll, which may be minutes away. DataUpdateCoordinator has no
+            # public way to reschedule without polling right now, so use
+            # the same method async_refresh() ends with.
+            self._schedule_refresh()
+
+    def _set_interval(self, interval: float) -> None:
+        self._interval = max(self._min_interval, min(interval, self._max_interval))
+        self.update_interval = self._jittered(self._interval)
+
+    @staticmethod
+    def _jittered(interval: float) -> timedelta:
+        jitter = random.uniform(-SCAN_INTERVAL_JITTER, SCAN_INTERVAL_JITTER)
+        return timedelta(seconds=interval * (1 + jitter))
@@ -0,0 +1,57 @@
+"""Diagnostics support for Kincony SHA."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import KinconyCoordinator
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the entry settings, board states and transport metrics."""
+    coordinators: dict[int, KinconyCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    # Every board of an entry talks through the same connection.
+    client = next(iter(coordinators.values())).client
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "boards": {
+            address: _board_diagnostics(coordinator)
+            for address, coordinator in coordinators.items()
+        },
+        "connected": client.connected,
+        "transport": client.metrics.as_dict(),
+    }
+
+
+def _board_diagnostics(coordinator: KinconyCoordinator) -> dict[str, Any]:
+    client = coordinator.client
+    return {
+        "channel_count": client.channel_count,
+        "input_count": client.input_count,
+        "bulk_read_supported": client.bulk_read_supported,
+        "bulk_write_supported": client.bulk_write_supported,
+        "inputs_supported": client.inputs_supported,
+        "poll": {
+            "last_update_success": coordinator.last_update_success,
+            "last_duration_ms": (
+                None
+                if coordinator.last_poll_duration is None
+                else round(coordinator.last_poll_duration * 1000, 3)
+            ),
+        },
+        "relays": coordinator.data,
+        "inputs": coordinator.inputs,
+    }
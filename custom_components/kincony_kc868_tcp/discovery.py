@@ -0,0 +1,129 @@
+"""LAN discovery of Kincony SHA boards."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import ipaddress
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .const import DISCOVERY_CONCURRENCY, DISCOVERY_TIMEOUT, MAX_DISCOVERY_HOSTS
+from .protocol import (
+    Frame,
+    FrameParser,
+    ProtocolError,
+    parse_channel_count,
+    parse_frame,
+    relay_scan,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class DiscoveredBoard:
+    """A board that answered a probe, with the relay count it announced."""
+
+    host: str
+    channel_count: int | None
+
+
+def parse_host_range(value: str) -> list[str] | None:
+    """Expand a subnet or an address range into its hosts.
+
+    Accepts "192.168.1.0/24", "192.168.1.10-192.168.1.50" and the short
+    form "192.168.1.10-50". Returns None for anything else, which is taken
+    to be a single host name or address. Raises ValueError for a range
+    that is malformed or larger than MAX_DISCOVERY_HOSTS.
+    """
+    value = value.strip()
+    if "/" in value:
+        network = ipaddress.ip_network(value, strict=False)
+        if network.num_addresses > MAX_DISCOVERY_HOSTS + 2:
+            raise ValueError(f"{value} has more than {MAX_DISCOVERY_HOSTS} hosts")
+        return [str(host) for host in network.hosts()]
+    first_text, dash, last_text = value.partition("-")
+    if not dash:
+        return None
+    try:
+        first = ipaddress.IPv4Address(first_text.strip())
+    except ValueError:
+        # A host name such as kc868-1.local.
+        return None
+    last_text = last_text.strip()
+    if last_text.isdigit():
+        last_text = first_text.strip().rsplit(".", 1)[0] + "." + last_text
+    last = ipaddress.IPv4Address(last_text)
+    count = int(last) - int(first) + 1
+    if count < 1 or count > MAX_DISCOVERY_HOSTS:
+        raise ValueError(f"{value} is not a range of 1-{MAX_DISCOVERY_HOSTS} hosts")
+    return [str(first + offset) for offset in range(count)]
+
+
+async def async_probe(
+    host: str, port: int, timeout: float = DISCOVERY_TIMEOUT
+) -> DiscoveredBoard | None:
+    """Ask one address for its relay count; None if no board answers."""
+    command = relay_scan()
+    parser = FrameParser()
+    heard: Frame | None = None
+    writer: asyncio.StreamWriter | None = None
+    try:
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(command.encode())
+            while True:
+                buffer = parser.get_buffer()
+                data = await reader.read(len(buffer))
+                if not data:
+                    break
+                buffer[: len(data)] = data
+                for raw in parser.buffer_updated(len(data)):
+                    frame = parse_frame(raw)
+                    if frame is None:
+                        continue
+                    heard = frame
+                    if command.matches(frame) or frame.kind == "ERROR":
+                        return DiscoveredBoard(host, _channel_count(frame))
+    except (OSError, TimeoutError):
+        pass
+    finally:
+        if writer is not None:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+    # Something KC868-like talked, but never answered the scan.
+    return None if heard is None else DiscoveredBoard(host, None)
+
+
+async def async_discover(
+    hosts: Iterable[str],
+    port: int,
+    *,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> list[DiscoveredBoard]:
+    """Probe many addresses at once and return the boards that answered.
+
+    At most concurrency probes are open at a time, and each gives up after
+    timeout seconds, so a /24 is covered in a few seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _probe(host: str) -> DiscoveredBoard | None:
+        async with semaphore:
+            return await async_probe(host, port, timeout)
+
+    results = await asyncio.gather(*(_probe(host) for host in hosts))
+    boards = [board for board in results if board is not None]
+    _LOGGER.debug("Discovery on port %s found %s", port, boards)
+    return boards
+
+
+def _channel_count(frame: Frame) -> int | None:
+    try:
+        return parse_channel_count(frame)
+    except ProtocolError:
+        return None
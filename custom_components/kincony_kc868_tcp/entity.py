@@ -0,0 +1,56 @@
+"""Base entity for Kincony SHA."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import KinconyCoordinator
+
+
+class KinconyEntity(CoordinatorEntity[KinconyCoordinator]):
+    """An entity that belongs to one Kincony board.
+
+    Coordinator updates are only written to the state machine when they
+    change what this entity shows, so a quiet poll of a 32 relay board does
+    not produce 32 state writes.
+    """
+
+    # What was last written: availability, state and attributes.
+    _written: tuple[Any, ...] | None = None
+
+    def __init__(self, coordinator: KinconyCoordinator) -> None:
+        super().__init__(coordinator)
+        client = coordinator.client
+        name = client.host
+        if client.board_id != client.host:
+            name = f"{client.host} #{client.address}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, client.board_id)},
+            name=f"Kincony ({name})",
+            manufacturer="Kincony",
+            model="SHA",
+            configuration_url=f"http://{client.host}",
+        )
+
+    @property
+    def available(self) -> bool:
+        # Nothing is known about the relays until the first read succeeds.
+        return super().available and self.coordinator.data is not None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self._snapshot() != self._written:
+            self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        self._written = self._snapshot()
+        super().async_write_ha_state()
+
+    def _snapshot(self) -> tuple[Any, ...]:
+        return (self.available, self.state, self.extra_state_attributes)
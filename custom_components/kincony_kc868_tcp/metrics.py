@@ -0,0 +1,164 @@
+"""Transport instrumentation for Kincony SHA."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets; the last bucket
+# collects everything slower.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Recent samples kept per histogram for percentiles.
+RECENT_SAMPLES = 256
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Bucketed durations plus a window of recent samples for percentiles."""
+
+    counts: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    recent: deque[float] = field(
+        default_factory=lambda: deque(maxlen=RECENT_SAMPLES)
+    )
+    total: float = 0.0
+    maximum: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.recent.append(seconds)
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the given percentile of the recent samples, if any."""
+        return _percentile(list(self.recent), fraction)
+
+    def as_dict(self) -> dict[str, Any]:
+        count = self.count
+        buckets = {
+            f"le_{bound * 1000:g}ms": n
+            for bound, n in zip(LATENCY_BUCKETS, self.counts, strict=False)
+        }
+        buckets["slower"] = self.counts[-1]
+        return {
+            "count": count,
+            "mean_ms": _ms(self.total / count) if count else None,
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "max_ms": _ms(self.maximum),
+            "buckets": buckets,
+        }
+
+
+@dataclass(slots=True)
+class CommandStats:
+    """Counters for one command kind (SET, READ, STATE, ...)."""
+
+    latency: Histogram = field(default_factory=Histogram)
+    lock_wait: Histogram = field(default_factory=Histogram)
+    errors: int = 0
+    timeouts: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "latency": self.latency.as_dict(),
+            "lock_wait": self.lock_wait.as_dict(),
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+        }
+
+
+@dataclass(slots=True)
+class TransportMetrics:
+    """What one connection to a board has been doing.
+
+    Latency covers the time from writing a command to its reply; lock wait is
+    the time a command queued behind others first. Together they tell a slow
+    firmware apart from contention on the shared connection. Service time is
+    how long each turn held the connection, failed commands and connects
+    included, and busy_seconds adds those turns up.
+    """
+
+    commands: dict[str, CommandStats] = field(default_factory=dict)
+    reconnects: int = 0
+    parse_failures: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    polls_shared: int = 0
+    service: Histogram = field(default_factory=Histogram)
+    # Time commands were held back by the rate limit.
+    throttle: Histogram = field(default_factory=Histogram)
+    # What happened to commands that found the queue full.
+    polls_dropped: int = 0
+    commands_rejected: int = 0
+    commands_coalesced: int = 0
+
+    def command(self, kind: str) -> CommandStats:
+        stats = self.commands.get(kind)
+        if stats is None:
+            stats = self.commands[kind] = CommandStats()
+        return stats
+
+    def enqueue(self) -> None:
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def dequeue(self) -> None:
+        self.queue_depth -= 1
+
+    def served(self, seconds: float) -> None:
+        self.service.record(seconds)
+
+    @property
+    def busy_seconds(self) -> float:
+        return self.service.total
+
+    def latency_percentile(self, fraction: float) -> float | None:
+        """Return a latency percentile over recent commands of every kind."""
+        samples = [
+            sample
+            for stats in self.commands.values()
+            for sample in stats.latency.recent
+        ]
+        return _percentile(samples, fraction)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "commands": {
+                kind: stats.as_dict() for kind, stats in sorted(self.commands.items())
+            },
+            "reconnects": self.reconnects,
+            "parse_failures": self.parse_failures,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "polls_shared": self.polls_shared,
+            "service": self.service.as_dict(),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throttle": self.throttle.as_dict(),
+            "polls_dropped": self.polls_dropped,
+            "commands_rejected": self.commands_rejected,
+            "commands_coalesced": self.commands_coalesced,
+        }
+
+
+def _percentile(samples: list[float], fraction: float) -> float | None:
+    if not samples:
+        return None
+    samples.sort()
+    return samples[min(len(samples) - 1, round(fraction * (len(samples) - 1)))]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
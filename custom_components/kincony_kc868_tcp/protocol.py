@@ -0,0 +1,289 @@
+"""KC868 text protocol codec for Kincony SHA."""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+
+_LOGGER = logging.getLogger(__name__)
+
+# Address (kcode) of a board answering on its own; boards chained behind a
+# KC868 gateway are told apart by their own addresses.
+DEFAULT_ADDRESS = 255
+RECEIVE_BUFFER_SIZE = 1024
+
+# Command replies end in ",OK" or ",ERROR". A few frames (the HOST-TEST-START
+# answer to RELAY-TEST-NOW, the RELAY-ERROR answer to unknown commands) carry
+# no status, so line breaks and NULs also close a frame and known bare frames
+# are recognised on their own.
+_TERMINATORS = (b",OK", b",ERROR")
+_SEPARATORS = (b"\r", b"\n", b"\0")
+_BARE_FRAMES = (b"HOST-TEST-START", b"RELAY-ERROR")
+
+# address, channel, state
+_RELAY_REPLY_FIELDS = 3
+
+_FRAME_RE = re.compile(
+    r"^(?P<source>[A-Z]+)-(?P<kind>[A-Z_]+)(?:-(?P<args>.*?))?(?:,(?P<status>OK|ERROR))?$"
+)
+
+
+class ProtocolError(ValueError):
+    """Raised when a frame does not carry the expected answer."""
+
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """One complete frame received from the board."""
+
+    raw: str
+    kind: str
+    args: tuple[str, ...]
+    status: str | None
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "ERROR"
+
+
+@dataclass(frozen=True, slots=True)
+class Command:
+    """A request and the information needed to recognise its reply."""
+
+    payload: str
+    kind: str
+    channel: int | None = None
+    address: int | None = None
+
+    def encode(self) -> bytes:
+        return self.payload.encode()
+
+    def matches(self, frame: Frame) -> bool:
+        """Return True if the frame answers this command."""
+        if frame.kind != self.kind:
+            return False
+        if self.address is not None and not is_from(frame, self.address):
+            return False
+        if self.channel is None:
+            return True
+        return len(frame.args) > 1 and frame.args[1] == str(self.channel)
+
+
+class FrameParser:
+    """Incremental splitter for the byte stream coming from the board.
+
+    Data is received straight into a reusable buffer handed out by
+    get_buffer(), so a read never allocates; only complete frames are
+    decoded. Partial frames stay in the buffer until the rest arrives.
+    """
+
+    def __init__(self, size: int = RECEIVE_BUFFER_SIZE) -> None:
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._length = 0
+
+    def get_buffer(self) -> memoryview:
+        """Return the free tail of the receive buffer."""
+        if self._length == len(self._buffer):
+            # A frame longer than the whole buffer is line noise; resync.
+            _LOGGER.debug("Discarding %d bytes without a frame end", self._length)
+            self._length = 0
+        return self._view[self._length :]
+
+    def buffer_updated(self, nbytes: int) -> list[str]:
+        """Account for nbytes written into the buffer and return new frames."""
+        self._length += nbytes
+        frames: list[str] = []
+        start = 0
+        while (end := self._frame_end(start)) is not None:
+            frame = bytes(self._view[start:end]).strip(b"\r\n\0 ")
+            if frame:
+                frames.append(frame.decode("ascii", "replace"))
+            start = end
+        if start:
+            remaining = self._length - start
+            self._view[:remaining] = self._view[start : self._length]
+            self._length = remaining
+        return frames
+
+    def _frame_end(self, start: int) -> int | None:
+        """Return the offset just past the first complete frame, if any."""
+        best: int | None = None
+        buffer, length = self._buffer, self._length
+        for token in _TERMINATORS + _BARE_FRAMES:
+            index = buffer.find(token, start, length)
+            if index != -1 and (best is None or index + len(token) < best):
+                best = index + len(token)
+        for token in _SEPARATORS:
+            index = buffer.find(token, start, length)
+            if index != -1 and (best is None or index + 1 < best):
+                best = index + 1
+        return best
+
+
+def parse_frame(raw: str) -> Frame | None:
+    """Split a raw frame into kind, arguments and status."""
+    match = _FRAME_RE.match(raw)
+    if not match:
+        return None
+    args = match.group("args")
+    kind = match.group("kind")
+    return Frame(
+        raw=raw,
+        kind=kind,
+        args=tuple(args.split(",")) if args else (),
+        # Some firmware answers unknown commands with a bare RELAY-ERROR.
+        status="ERROR" if kind == "ERROR" else match.group("status"),
+    )
+
+
+def is_from(frame: Frame, address: int) -> bool:
+    """Return True if an addressed frame comes from the board at address."""
+    return bool(frame.args) and frame.args[0] == str(address)
+
+
+def relay_set(address: int, channel: int, state: bool) -> Command:
+    return Command(
+        f"RELAY-SET-{address},{channel},{int(state)}", "SET", channel, address
+    )
+
+
+def relay_read(address: int, channel: int) -> Command:
+    return Command(f"RELAY-READ-{address},{channel}", "READ", channel, address)
+
+
+def relay_state(address: int) -> Command:
+    return Command(f"RELAY-STATE-{address}", "STATE", address=address)
+
+
+def relay_set_all(address: int, mask: int, channel_count: int) -> Command:
+    """Build a RELAY-SET_ALL request that writes every relay from a bitmask."""
+    banks = ",".join(
+        str(mask >> (8 * bank) & 0xFF)
+        for bank in reversed(range((channel_count + 7) // 8))
+    )
+    return Command(f"RELAY-SET_ALL-{address},{banks}", "SET_ALL", address=address)
+
+
+def relay_get_input(address: int) -> Command:
+    return Command(f"RELAY-GET_INPUT-{address}", "GET_INPUT", address=address)
+
+
+def relay_test() -> Command:
+    return Command("RELAY-TEST-NOW", "TEST")
+
+
+def relay_scan() -> Command:
+    return Command("RELAY-SCAN_DEVICE-NOW", "SCAN_DEVICE")
+
+
+def _check(frame: Frame, kind: str) -> None:
+    if frame.kind != kind or not frame.ok:
+        raise ProtocolError(f"Unexpected reply to {kind}: {frame.raw}")
+
+
+def parse_relay_set(frame: Frame) -> bool:
+    """Return the relay state echoed by RELAY-SET."""
+    _check(frame, "SET")
+    if len(frame.args) != _RELAY_REPLY_FIELDS:
+        raise ProtocolError(f"Cannot parse relay set reply: {frame.raw}")
+    return frame.args[2] == "1"
+
+
+def parse_relay_read(frame: Frame) -> bool:
+    """Return the relay state reported by RELAY-READ."""
+    _check(frame, "READ")
+    if len(frame.args) != _RELAY_REPLY_FIELDS:
+        raise ProtocolError(f"Cannot parse status: {frame.raw}")
+    return frame.args[2] == "1"
+
+
+def parse_relay_state(frame: Frame) -> int:
+    """Return all relays reported by RELAY-STATE as a bitmask.
+
+    The board answers with one byte per bank of eight relays, most
+    significant bank first, so relay 1 ends up in bit 0.
+    """
+    return _parse_banks(frame, "STATE")
+
+
+def parse_relay_set_all(frame: Frame) -> int:
+    """Return the relay bitmask echoed by RELAY-SET_ALL."""
+    return _parse_banks(frame, "SET_ALL")
+
+
+def apply_relay_report(
+    frame: Frame, mask: int | None, address: int = DEFAULT_ADDRESS
+) -> int | None:
+    """Apply a relay report the board sent on its own to a known bitmask.
+
+    The board announces relay changes made by other clients or its own
+    buttons with the same frames it uses for replies. Returns the updated
+    bitmask, or None when the frame is not a relay report for the board at
+    address or a single-relay report arrives before the full state is known.
+    """
+    if not is_from(frame, address):
+        return None
+    if frame.kind in ("STATE", "SET_ALL"):
+        return _parse_banks(frame, frame.kind)
+    if frame.kind not in ("SET", "READ") or mask is None:
+        return None
+    _check(frame, frame.kind)
+    if len(frame.args) != _RELAY_REPLY_FIELDS or not frame.args[1].isdigit():
+        raise ProtocolError(f"Cannot parse relay report: {frame.raw}")
+    bit = 1 << (int(frame.args[1]) - 1)
+    return mask | bit if frame.args[2] == "1" else mask & ~bit
+
+
+def parse_relay_get_input(frame: Frame) -> int:
+    """Return the digital inputs reported by RELAY-GET_INPUT as a bitmask.
+
+    Inputs are packed like relays, input 1 in bit 0. The board reports the
+    raw line level: a bit is cleared while its input is closed (active).
+    """
+    return _parse_banks(frame, "GET_INPUT")
+
+
+def apply_input_report(
+    frame: Frame, mask: int | None, address: int = DEFAULT_ADDRESS
+) -> int | None:
+    """Apply an input change the board sent on its own to a known bitmask.
+
+    Besides GET_INPUT frames, the board announces an input closing with
+    RELAY-ALARM-<input> and opening again with RELAY-DIS_ALARM-<input>.
+    Those carry no address, so callers sharing a link between several boards
+    must decide which board they belong to. Returns the updated raw bitmask,
+    or None when the frame is not an input report or a single input changes
+    before the full state is known.
+    """
+    if frame.kind == "GET_INPUT":
+        return _parse_banks(frame, frame.kind) if is_from(frame, address) else None
+    if frame.kind not in ("ALARM", "DIS_ALARM") or mask is None:
+        return None
+    _check(frame, frame.kind)
+    if not frame.args or not frame.args[0].isdigit():
+        raise ProtocolError(f"Cannot parse input report: {frame.raw}")
+    bit = 1 << (int(frame.args[0]) - 1)
+    return mask & ~bit if frame.kind == "ALARM" else mask | bit
+
+
+def _parse_banks(frame: Frame, kind: str) -> int:
+    _check(frame, kind)
+    try:
+        banks = [int(value) for value in frame.args[1:]]
+    except ValueError as exc:
+        raise ProtocolError(f"Cannot parse relay states: {frame.raw}") from exc
+    if not banks:
+        raise ProtocolError(f"Cannot parse relay states: {frame.raw}")
+    mask = 0
+    for bank in banks:
+        mask = (mask << 8) | bank
+    return mask
+
+
+def parse_channel_count(frame: Frame) -> int | None:
+    """Return the relay count announced by RELAY-SCAN_DEVICE, if any."""
+    _check(frame, "SCAN_DEVICE")
+    match = re.fullmatch(r"CHANNEL_(\d+)", frame.args[0]) if frame.args else None
+    return int(match.group(1)) if match else None
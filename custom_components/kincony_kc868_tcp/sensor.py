@@ -0,0 +1,163 @@
+"""Diagnostic and relay statistics sensors for Kincony SHA."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import KinconyCoordinator
+from .entity import KinconyEntity
+
+
+@dataclass(frozen=True, kw_only=True)
+class KinconySensorEntityDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor and where its value comes from."""
+
+    value_fn: Callable[[KinconyCoordinator], float | None]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+SENSORS: tuple[KinconySensorEntityDescription, ...] = (
+    KinconySensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _ms(coordinator.last_poll_duration),
+    ),
+    KinconySensorEntityDescription(
+        key="command_latency_p95",
+        name="Command latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _ms(
+            coordinator.client.metrics.latency_percentile(0.95)
+        ),
+    ),
+    KinconySensorEntityDescription(
+        key="queue_depth",
+        name="Command queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.client.metrics.queue_depth,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up Kincony diagnostic and relay statistics sensors from a config entry."""
+    coordinators: dict[int, KinconyCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    entities: list[SensorEntity] = [
+        KinconyDiagnosticSensor(coordinator, description)
+        for coordinator in coordinators.values()
+        for description in SENSORS
+    ]
+    for coordinator in coordinators.values():
+        for channel in range(1, coordinator.client.channel_count + 1):
+            entities.append(KinconyRelayCyclesSensor(coordinator, channel))
+            entities.append(KinconyRelayOnTimeSensor(coordinator, channel))
+    async_add_entities(entities)
+
+
+class KinconyDiagnosticSensor(KinconyEntity, SensorEntity):
+    """Connection health of a board, refreshed with every poll or push.
+
+    Disabled by default; enable them when chasing slow or missed commands.
+    """
+
+    entity_description: KinconySensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: KinconyCoordinator,
+        description: KinconySensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.client.board_id}-{description.key}"
+
+    @property
+    def available(self) -> bool:
+        # Timings stay meaningful while the board is unreachable.
+        return True
+
+    @property
+    def native_value(self) -> float | None:
+        return self.entity_description.value_fn(self.coordinator)
+
+
+class KinconyRelayStatSensor(KinconyEntity, SensorEntity):
+    """A switching statistic of one relay, counted by the integration.
+
+    The counters are fed from the relay states the board already reports,
+    so they cost no traffic, and survive restarts. Disabled by default;
+    enable them to track wear on relays that switch often.
+    """
+
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _key: str
+
+    def __init__(self, coordinator: KinconyCoordinator, channel: int) -> None:
+        super().__init__(coordinator)
+        self.channel = channel
+        board_id = coordinator.client.board_id
+        self._attr_unique_id = f"{board_id}-relay-{channel}-{self._key}"
+
+    @property
+    def available(self) -> bool:
+        # The counters stay meaningful while the board is unreachable.
+        return True
+
+
+class KinconyRelayCyclesSensor(KinconyRelayStatSensor):
+    """How often a relay has switched on."""
+
+    _key = "cycles"
+
+    def __init__(self, coordinator: KinconyCoordinator, channel: int) -> None:
+        super().__init__(coordinator, channel)
+        self._attr_name = f"Relay {channel} cycles"
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.client.stats.cycles.get(self.channel, 0)
+
+
+class KinconyRelayOnTimeSensor(KinconyRelayStatSensor):
+    """How long a relay has been on, in hours.
+
+    Rounded to 0.01 h, so a relay that stays on changes the state at most
+    every 36 seconds rather than with every poll.
+    """
+
+    _key = "on_time"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+
+    def __init__(self, coordinator: KinconyCoordinator, channel: int) -> None:
+        super().__init__(coordinator, channel)
+        self._attr_name = f"Relay {channel} on time"
+
+    @property
+    def native_value(self) -> float:
+        stats = self.coordinator.client.stats
+        return round(stats.on_time(self.channel, self.hass.loop.time()) / 3600, 2)
@@ -0,0 +1,155 @@
+"""Services for Kincony SHA."""
+
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_ADDRESS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DURATION,
+    ATTR_MASK,
+    ATTR_RELAY,
+    ATTR_RELAYS,
+    DOMAIN,
+    SERVICE_PULSE,
+    SERVICE_SET_RELAYS,
+)
+from .coordinator import KinconyCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SET_RELAYS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_ADDRESS): vol.Coerce(int),
+            vol.Exclusive(ATTR_RELAYS, "relays"): {vol.Coerce(int): cv.boolean},
+            vol.Exclusive(ATTR_MASK, "relays"): vol.All(
+                vol.Coerce(int), vol.Range(min=0)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_RELAYS, ATTR_MASK),
+)
+
+PULSE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_ADDRESS): vol.Coerce(int),
+        vol.Required(ATTR_RELAY): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(ATTR_DURATION): cv.positive_time_period,
+    }
+)
+
+
+def _coordinator(call: ServiceCall) -> KinconyCoordinator:
+    """Return the board a call is for; the address may be left out if unique."""
+    entry_id: str = call.data[ATTR_CONFIG_ENTRY_ID]
+    coordinators: dict[int, KinconyCoordinator] | None = call.hass.data.get(
+        DOMAIN, {}
+    ).get(entry_id)
+    if not coordinators:
+        raise ServiceValidationError(f"No loaded Kincony board with entry {entry_id}")
+    address: int | None = call.data.get(ATTR_ADDRESS)
+    if address is None:
+        if len(coordinators) > 1:
+            raise ServiceValidationError(
+                f"Entry {entry_id} serves several boards; pick one by address"
+            )
+        return next(iter(coordinators.values()))
+    if address not in coordinators:
+        raise ServiceValidationError(f"Entry {entry_id} has no board at {address}")
+    return coordinators[address]
+
+
+def _requested_states(call: ServiceCall, channel_count: int) -> dict[int, bool]:
+    """Turn the relays map or the bitmask of a call into channel states."""
+    if ATTR_MASK in call.data:
+        mask: int = call.data[ATTR_MASK]
+        if mask >> channel_count:
+            raise ServiceValidationError(
+                f"Mask {mask:#x} has bits beyond relay {channel_count}"
+            )
+        return {
+            channel: bool(mask >> (channel - 1) & 1)
+            for channel in range(1, channel_count + 1)
+        }
+    states: dict[int, bool] = call.data[ATTR_RELAYS]
+    for channel in states:
+        if not 1 <= channel <= channel_count:
+            raise ServiceValidationError(
+                f"Relay {channel} is outside 1-{channel_count}"
+            )
+    return states
+
+
+async def _async_set_relays(call: ServiceCall) -> None:
+    coordinator = _coordinator(call)
+    states = _requested_states(call, coordinator.channel_count)
+    if not states:
+        return
+    try:
+        relays = await coordinator.client.async_set_relays(states)
+    except Exception as err:
+        raise HomeAssistantError(
+            f"Failed to set relays on {coordinator.client.board_id}"
+        ) from err
+    # One update for the whole board instead of one per switched relay.
+    coordinator.async_set_updated_data(relays)
+
+
+async def _async_pulse(call: ServiceCall) -> ServiceResponse:
+    coordinator = _coordinator(call)
+    client = coordinator.client
+    channel: int = call.data[ATTR_RELAY]
+    if channel > coordinator.channel_count:
+        raise ServiceValidationError(
+            f"Relay {channel} is outside 1-{coordinator.channel_count}"
+        )
+    requested = call.data[ATTR_DURATION].total_seconds()
+    try:
+        width = await client.async_pulse(channel, requested)
+    except Exception as err:
+        raise HomeAssistantError(
+            f"Failed to pulse relay {channel} on {client.board_id}"
+        ) from err
+    coordinator.async_note_activity()
+    _LOGGER.debug(
+        "Pulsed relay %s on %s for %.1fms (requested %.1fms)",
+        channel,
+        client.board_id,
+        width * 1000,
+        requested * 1000,
+    )
+    if not call.return_response:
+        return None
+    return {
+        "requested_ms": round(requested * 1000, 1),
+        "width_ms": round(width * 1000, 1),
+        "drift_ms": round((width - requested) * 1000, 1),
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Kincony services."""
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_RELAYS, _async_set_relays, schema=SET_RELAYS_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PULSE,
+        _async_pulse,
+        schema=PULSE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,74 @@
+"""Relay switching statistics for Kincony SHA."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class RelayStats:
+    """Switching cycles and on-time of every relay of one board.
+
+    Fed with each relay mask the board confirms, so the counters cost work
+    only for the relays that changed. On-time is counted from the moment a
+    relay is seen on; time while the board was not being watched (before
+    the first read, across restarts) is not counted.
+    """
+
+    # Off-to-on transitions and completed on-time in seconds, by relay.
+    cycles: dict[int, int] = field(default_factory=dict)
+    on_seconds: dict[int, float] = field(default_factory=dict)
+    # Called whenever a counter changed, to schedule saving them.
+    on_change: Callable[[], None] | None = None
+    _mask: int | None = None
+    # Loop time since which each relay that is on has been on.
+    _on_since: dict[int, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> RelayStats:
+        """Restore counters saved by as_dict()."""
+        if not data:
+            return cls()
+        return cls(
+            cycles={int(key): value for key, value in data["cycles"].items()},
+            on_seconds={int(key): value for key, value in data["on_seconds"].items()},
+        )
+
+    def observe(self, mask: int, now: float) -> None:
+        """Account for the relay states the board confirmed at loop time now."""
+        previous, self._mask = self._mask, mask
+        changed = mask if previous is None else mask ^ previous
+        if not changed:
+            return
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            channel = bit.bit_length()
+            if mask & bit:
+                self._on_since[channel] = now
+                if previous is not None:
+                    self.cycles[channel] = self.cycles.get(channel, 0) + 1
+            elif (since := self._on_since.pop(channel, None)) is not None:
+                self.on_seconds[channel] = (
+                    self.on_seconds.get(channel, 0.0) + now - since
+                )
+        if self.on_change is not None:
+            self.on_change()
+
+    def on_time(self, channel: int, now: float) -> float:
+        """Return the seconds a relay has been on, its current run included."""
+        since = self._on_since.get(channel)
+        running = 0.0 if since is None else now - since
+        return self.on_seconds.get(channel, 0.0) + running
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the counters, current runs included, for saving."""
+        channels = self.on_seconds.keys() | self._on_since.keys()
+        return {
+            "cycles": dict(self.cycles),
+            "on_seconds": {
+                channel: round(self.on_time(channel, now), 1) for channel in channels
+            },
+        }
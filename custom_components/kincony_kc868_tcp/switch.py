@@ -2,92 +2,110 @@
 
 from __future__ import annotations
 
-import logging
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 
-from . import KinconyClient
-from .const import CONF_CHANNEL_COUNT, DEFAULT_CHANNEL_COUNT, DOMAIN
-
-_LOGGER = logging.getLogger(__name__)
+from .const import DOMAIN
+from .coordinator import KinconyCoordinator
+from .entity import KinconyEntity
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up Kincony switches from a config entry."""
-    client: KinconyClient = hass.data[DOMAIN][entry.entry_id]
-    channel_count: int = entry.options.get(
-        CONF_CHANNEL_COUNT, entry.data.get(CONF_CHANNEL_COUNT, DEFAULT_CHANNEL_COUNT)
-    )
+    coordinators: dict[int, KinconyCoordinator] = hass.data[DOMAIN][entry.entry_id]
 
     entities = [
-        KinconySwitch(client=client, channel=index)
-        for index in range(1, channel_count + 1)
+        KinconySwitch(coordinator=coordinator, channel=index)
+        for coordinator in coordinators.values()
+        for index in range(1, coordinator.channel_count + 1)
     ]
 
     async_add_entities(entities)
 
 
-class KinconySwitch(SwitchEntity):
-    """Representation of a Kincony relay switch."""
+class KinconySwitch(KinconyEntity, SwitchEntity, RestoreEntity):
+    """Representation of a Kincony relay switch.
 
-    _attr_should_poll = True
+    After a restart the last known state is shown, flagged as unconfirmed,
+    until the first bulk read of the board replaces it.
+    """
 
-    def __init__(self, client: KinconyClient, channel: int) -> None:
-        self._client = client
+    def __init__(self, coordinator: KinconyCoordinator, channel: int) -> None:
+        super().__init__(coordinator)
         self._channel = channel
         self._attr_name = f"Relay {channel}"
-        self._attr_unique_id = f"{client.host}-relay-{channel}"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, client.host)},
-            name=f"Kincony ({client.host})",
-            manufacturer="Kincony",
-            model="SHA",
-            configuration_url=f"http://{client.host}",
-        )
-        self._attr_is_on = False
-        self._attr_available = True
-
-    async def async_update(self) -> None:
-        try:
-            self._attr_is_on = await self._client.async_get_status(self._channel)
-            self._attr_available = True
-        except Exception as err:
-            _LOGGER.error(
-                "Failed to poll channel %s on %s: %s",
-                self._channel,
-                self._client.host,
-                err,
+        self._attr_unique_id = f"{coordinator.client.board_id}-relay-{channel}"
+        # Cleared when a command fails, restored by the next successful poll.
+        self._command_ok = True
+        # State from before the restart, used until the board has been read.
+        self._restored: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state in (STATE_ON, STATE_OFF):
+            self._restored = last_state.state == STATE_ON
+
+    @property
+    def available(self) -> bool:
+        if self.coordinator.data is None:
+            return (
+                self.coordinator.last_update_success
+                and self._command_ok
+                and self._restored is not None
             )
-            self._attr_available = False
+        return super().available and self._command_ok
 
-    async def async_turn_on(self, **kwargs: Any) -> None:
-        try:
-            await self._client.async_turn_on(self._channel)
-        except Exception as err:
-            self._attr_available = False
-            raise HomeAssistantError(
-                f"Failed to turn on channel {self._channel}"
-            ) from err
+    @property
+    def is_on(self) -> bool | None:
+        if self.coordinator.data is None:
+            return self._restored
+        return self.coordinator.data.get(self._channel)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.coordinator.data is None:
+            return {"unconfirmed": True}
+        return None
 
-        self._attr_is_on = True
-        self._attr_available = True
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._command_ok = True
+        super()._handle_coordinator_update()
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self._async_set_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_set_state(False)
+
+    async def _async_set_state(self, state: bool) -> None:
+        client = self.coordinator.client
         try:
-            await self._client.async_turn_off(self._channel)
+            if state:
+                await client.async_turn_on(self._channel)
+            else:
+                await client.async_turn_off(self._channel)
         except Exception as err:
-            self._attr_available = False
+            self._command_ok = False
+            self.async_write_ha_state()
             raise HomeAssistantError(
-                f"Failed to turn off channel {self._channel}"
+                f"Failed to turn {'on' if state else 'off'} channel {self._channel}"
             ) from err
 
-        self._attr_is_on = False
-        self._attr_available = True
+        self._command_ok = True
+        if self.coordinator.data is not None:
+            self.coordinator.data[self._channel] = state
+        else:
+            self._restored = state
+        self.coordinator.async_note_activity()
+        self.async_write_ha_state()
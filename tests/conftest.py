@@ -0,0 +1,84 @@
+"""Shared fixtures for the Kincony KC868 TCP tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.kincony_kc868_tcp.const import CONF_CHANNEL_COUNT, DOMAIN
+
+from .simulator import KC868Simulator
+
+SetupEntry = Callable[..., Awaitable[MockConfigEntry]]
+
+
+@pytest.fixture
+def channel_count() -> int:
+    """Relays of the simulated board; override it in a module to change it."""
+    return 8
+
+
+@pytest.fixture
+async def simulator(channel_count: int) -> AsyncIterator[KC868Simulator]:
+    sim = KC868Simulator(channel_count=channel_count)
+    await sim.start()
+    yield sim
+    await sim.stop()
+
+
+@pytest.fixture
+async def setup_entry(hass: Any) -> AsyncIterator[SetupEntry]:
+    """Set up entries for a board on localhost and unload them afterwards.
+
+    Further keyword arguments go to MockConfigEntry. Unless wait is False,
+    setting up returns once every board of the entry has been read.
+    """
+    entries: list[MockConfigEntry] = []
+
+    async def _setup(
+        port: int,
+        channel_count: int = 8,
+        options: dict[str, Any] | None = None,
+        *,
+        wait: bool = True,
+        **kwargs: Any,
+    ) -> MockConfigEntry:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_HOST: "127.0.0.1",
+                CONF_PORT: port,
+                CONF_CHANNEL_COUNT: channel_count,
+            },
+            options=options or {},
+            **kwargs,
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        if wait:
+            coordinators = hass.data[DOMAIN][entry.entry_id].values()
+            async with asyncio.timeout(2):
+                while any(c.data is None for c in coordinators):
+                    await asyncio.sleep(0.01)
+            await hass.async_block_till_done()
+        return entry
+
+    yield _setup
+    for entry in entries:
+        if entry.state is ConfigEntryState.LOADED:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+    # Let the timers of unloaded entries run out.
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
@@ -0,0 +1,124 @@
+"""Fault-injecting TCP proxy placed between the transport and the simulator."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import socket
+import struct
+
+from custom_components.kincony_kc868_tcp.protocol import FrameParser
+
+
+class FaultProxy:
+    """Asyncio TCP proxy that mistreats the replies of a KC868 board.
+
+    Commands pass through untouched. Replies are delayed by up to latency
+    seconds, dropped with probability drop_rate and, with split set, cut
+    into fragments sent apart. Accepting a connection waits accept_delay
+    seconds, and reset() tears every open connection down with a TCP RST.
+    Faults are drawn from a seeded generator, so a failing run can be
+    replayed.
+    """
+
+    def __init__(self, target_port: int, seed: int = 0) -> None:
+        self.target_port = target_port
+        self.latency = 0.0
+        self.drop_rate = 0.0
+        self.split = False
+        self.accept_delay = 0.0
+        self.dropped = 0
+        self.resets = 0
+        self._random = random.Random(seed)
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return int(self._server.sockets[0].getsockname()[1])
+
+    @property
+    def connections(self) -> int:
+        """Open client side connections."""
+        return len(self._writers)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self.reset()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def reset(self) -> None:
+        """Abort every open connection with a TCP RST."""
+        for writer in list(self._writers):
+            if writer.transport.is_closing():
+                continue
+            sock = writer.get_extra_info("socket")
+            with contextlib.suppress(OSError):
+                sock.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+                )
+            writer.transport.abort()
+            self.resets += 1
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        upstream: asyncio.StreamWriter | None = None
+        try:
+            if self.accept_delay:
+                await asyncio.sleep(self.accept_delay)
+            upstream_reader, upstream = await asyncio.open_connection(
+                "127.0.0.1", self.target_port
+            )
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._forward(reader, upstream))
+                group.create_task(self._replies(upstream_reader, writer))
+        except* (ConnectionError, OSError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.transport.abort()
+            if upstream is not None:
+                upstream.transport.abort()
+
+    async def _forward(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        while data := await reader.read(1024):
+            writer.write(data)
+            await writer.drain()
+        raise ConnectionResetError("Client went away")
+
+    async def _replies(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        parser = FrameParser()
+        while True:
+            buffer = parser.get_buffer()
+            data = await reader.read(len(buffer))
+            if not data:
+                raise ConnectionResetError("Board went away")
+            buffer[: len(data)] = data
+            for frame in parser.buffer_updated(len(data)):
+                await self._reply(frame.encode(), writer)
+
+    async def _reply(self, frame: bytes, writer: asyncio.StreamWriter) -> None:
+        if self._random.random() < self.drop_rate:
+            self.dropped += 1
+            return
+        if self.latency:
+            await asyncio.sleep(self._random.uniform(0, self.latency))
+        cut = self._random.randrange(1, len(frame)) if self.split else len(frame)
+        for part in (frame[:cut], frame[cut:]):
+            if part:
+                writer.write(part)
+                with contextlib.suppress(ConnectionError):
+                    await writer.drain()
+                await asyncio.sleep(0.001)
@@ -0,0 +1,150 @@
+"""Local KC868 board simulator used by the transport tests and benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+
+_COMMAND_RE = re.compile(r"RELAY-(?P<kind>[A-Z_]+)-(?P<args>NOW|[0-9,]*)")
+
+
+class KC868Simulator:
+    """Asyncio TCP server that answers like a KC868 relay board.
+
+    Supports RELAY-SET, RELAY-READ, RELAY-STATE, RELAY-SET_ALL,
+    RELAY-GET_INPUT, RELAY-TEST-NOW and RELAY-SCAN_DEVICE-NOW with a
+    configurable relay count and reply latency. Firmware without the bulk
+    commands can be emulated with bulk=False. Every address gets its own
+    relays, as boards chained behind one gateway would. Firmware that
+    only serves a few clients can be emulated with max_clients; further
+    connections are closed as soon as they are accepted, and commands
+    whose kind is in ignored are never answered.
+    """
+
+    def __init__(
+        self,
+        channel_count: int = 32,
+        latency: float = 0.0,
+        bulk: bool = True,
+        max_clients: int | None = None,
+    ) -> None:
+        self.channel_count = channel_count
+        self.latency = latency
+        self.bulk = bulk
+        self.max_clients = max_clients
+        self.refused = 0
+        self.masks: dict[int, int] = {}
+        # Raw input levels of eight inputs; a cleared bit is a closed input.
+        self.inputs = 0xFF
+        # Kinds of command the board never answers, as old firmware does.
+        self.ignored: set[str] = set()
+        self.commands: list[str] = []
+        # Loop time, address, relay and state of every relay switched.
+        self.switched: list[tuple[float, int, int, bool]] = []
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return int(self._server.sockets[0].getsockname()[1])
+
+    @property
+    def mask(self) -> int:
+        """Relays of the board at the default address 255."""
+        return self.masks.get(255, 0)
+
+    @mask.setter
+    def mask(self, value: int) -> None:
+        self.masks[255] = value
+
+    @property
+    def connections(self) -> int:
+        return len(self._writers)
+
+    async def start(self, port: int = 0) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", port)
+
+    async def stop(self) -> None:
+        for writer in list(self._writers):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def report(self, channel: int, state: bool, address: int = 255) -> None:
+        """Switch a relay as a physical button would and announce it."""
+        self._set(address, channel, state)
+        for writer in self._writers:
+            writer.write(f"RELAY-SET-{address},{channel},{int(state)},OK".encode())
+
+    def trigger_input(self, channel: int, active: bool) -> None:
+        """Close or open a digital input and announce it."""
+        bit = 1 << (channel - 1)
+        self.inputs = self.inputs & ~bit if active else self.inputs | bit
+        kind = "ALARM" if active else "DIS_ALARM"
+        for writer in self._writers:
+            writer.write(f"RELAY-{kind}-{channel},OK".encode())
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if self.max_clients is not None and self.connections >= self.max_clients:
+            self.refused += 1
+            writer.close()
+            return
+        self._writers.add(writer)
+        try:
+            while data := await reader.read(1024):
+                for match in _COMMAND_RE.finditer(data.decode()):
+                    self.commands.append(match.group(0))
+                    if match.group("kind") in self.ignored:
+                        continue
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    writer.write(self._answer(match.group("kind"), match["args"]))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _answer(self, kind: str, raw_args: str) -> bytes:  # noqa: PLR0911
+        args = raw_args.split(",")
+        address = int(args[0]) if args[0].isdigit() else 255
+        if kind == "TEST":
+            return b"HOST-TEST-START"
+        if kind == "SCAN_DEVICE":
+            return f"RELAY-SCAN_DEVICE-CHANNEL_{self.channel_count},OK".encode()
+        if kind == "SET" and len(args) == 3:
+            self._set(address, int(args[1]), args[2] == "1")
+            return f"RELAY-SET-{raw_args},OK".encode()
+        if kind == "READ" and len(args) == 2:
+            state = self.masks.get(address, 0) >> (int(args[1]) - 1) & 1
+            return f"RELAY-READ-{raw_args},{state},OK".encode()
+        if kind == "STATE" and self.bulk:
+            return f"RELAY-STATE-{args[0]},{self._banks(address)},OK".encode()
+        if kind == "GET_INPUT":
+            return f"RELAY-GET_INPUT-{args[0]},{self.inputs},OK".encode()
+        if kind == "SET_ALL" and self.bulk:
+            mask = 0
+            for bank in args[1:]:
+                mask = (mask << 8) | int(bank)
+            self.masks[address] = mask
+            return f"RELAY-SET_ALL-{args[0]},{self._banks(address)},OK".encode()
+        return b"RELAY-ERROR"
+
+    def _set(self, address: int, channel: int, state: bool) -> None:
+        now = asyncio.get_running_loop().time()
+        self.switched.append((now, address, channel, state))
+        bit = 1 << (channel - 1)
+        mask = self.masks.get(address, 0)
+        self.masks[address] = mask | bit if state else mask & ~bit
+
+    def _banks(self, address: int) -> str:
+        mask = self.masks.get(address, 0)
+        return ",".join(
+            str(mask >> (8 * bank) & 0xFF)
+            for bank in reversed(range((self.channel_count + 7) // 8))
+        )
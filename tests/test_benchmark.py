@@ -0,0 +1,124 @@
+"""Latency and throughput benchmarks against the KC868 simulator.
+
+Run with ``pytest -m benchmark -s`` to see the timing tables. The number of
+rounds can be raised with the KINCONY_BENCH_ROUNDS environment variable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from custom_components.kincony_kc868_tcp import KinconyClient
+
+from .simulator import KC868Simulator
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled"),
+]
+
+ROUNDS = int(os.environ.get("KINCONY_BENCH_ROUNDS", "50"))
+CHANNELS = 32
+CONCURRENT_CALLERS = 8
+
+
+def _report(name: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, round(len(ordered) * 0.99))]
+    print(
+        f"\n{name}: n={len(samples)} "
+        f"min={ordered[0] * 1000:.3f}ms "
+        f"p50={statistics.median(ordered) * 1000:.3f}ms "
+        f"p99={p99 * 1000:.3f}ms "
+        f"max={ordered[-1] * 1000:.3f}ms"
+    )
+
+
+@pytest.fixture
+def channel_count() -> int:
+    return CHANNELS
+
+
+@pytest.fixture
+async def client(hass: Any, simulator: KC868Simulator) -> AsyncIterator[KinconyClient]:
+    kincony = KinconyClient(
+        hass, "127.0.0.1", simulator.port, CHANNELS, write_window=0, state_ttl=0
+    )
+    yield kincony
+    kincony.close()
+
+
+async def _time(samples: list[float], call: Any) -> None:
+    start = time.perf_counter()
+    await call
+    samples.append(time.perf_counter() - start)
+
+
+@pytest.mark.asyncio
+async def test_full_board_poll(
+    client: KinconyClient, simulator: KC868Simulator
+) -> None:
+    """A full-board poll costs one request; per-channel firmware costs 32."""
+    bulk: list[float] = []
+    for _ in range(ROUNDS):
+        await _time(bulk, client.async_get_states())
+    _report("full board poll (bulk)", bulk)
+    assert simulator.commands.count("RELAY-STATE-255") == ROUNDS
+    assert len(simulator.commands) == ROUNDS
+
+    simulator.bulk = False
+    client._bulk_supported = None
+    simulator.commands.clear()
+    fallback: list[float] = []
+    for _ in range(ROUNDS):
+        await _time(fallback, client.async_get_states())
+    _report("full board poll (per channel)", fallback)
+    assert len(simulator.commands) == 1 + ROUNDS * CHANNELS
+
+
+@pytest.mark.asyncio
+async def test_single_command_latency(
+    client: KinconyClient, simulator: KC868Simulator
+) -> None:
+    """Round trip of a single relay write with no coalescing window."""
+    samples: list[float] = []
+    for index in range(ROUNDS * 4):
+        channel = index % CHANNELS + 1
+        await _time(samples, client.async_turn_on(channel))
+    _report("single RELAY-SET", samples)
+    assert simulator.mask == (1 << CHANNELS) - 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_throughput(
+    client: KinconyClient, simulator: KC868Simulator
+) -> None:
+    """Commands per second with several callers sharing one connection."""
+
+    async def caller(offset: int) -> list[bool]:
+        return [
+            await client.async_get_status((offset + index) % CHANNELS + 1)
+            for index in range(ROUNDS)
+        ]
+
+    simulator.mask = 0x5555_5555
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(caller(offset) for offset in range(CONCURRENT_CALLERS))
+    )
+    elapsed = time.perf_counter() - start
+    total = CONCURRENT_CALLERS * ROUNDS
+    print(
+        f"\nconcurrent reads: {total} commands from {CONCURRENT_CALLERS} callers "
+        f"in {elapsed * 1000:.1f}ms ({total / elapsed:.0f} commands/s)"
+    )
+    for offset, states in enumerate(results):
+        expected = [(offset + index) % CHANNELS % 2 == 0 for index in range(ROUNDS)]
+        assert states == expected
@@ -0,0 +1,50 @@
+"""Digital input tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+
+from custom_components.kincony_kc868_tcp.const import CONF_INPUT_COUNT
+
+from .conftest import SetupEntry
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled")
+
+
+@pytest.mark.asyncio
+async def test_inputs_are_read_with_relays_and_pushed(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """Inputs come from the relay poll cycle and from board reports."""
+    simulator.inputs = 0b1101
+    await setup_entry(simulator.port, 4, {CONF_INPUT_COUNT: 4})
+
+    assert hass.states.get("binary_sensor.input_1").state == STATE_OFF
+    assert hass.states.get("binary_sensor.input_2").state == STATE_ON
+    assert len(hass.states.async_entity_ids("binary_sensor")) == 4
+
+    simulator.trigger_input(1, True)
+    async with asyncio.timeout(2):
+        while hass.states.get("binary_sensor.input_1").state != STATE_ON:
+            await asyncio.sleep(0.01)
+    assert simulator.commands == ["RELAY-STATE-255", "RELAY-GET_INPUT-255"]
+
+
+@pytest.mark.asyncio
+async def test_unanswered_input_reads_keep_the_relays(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """Inputs the firmware never answers are unavailable; relays are not."""
+    simulator.ignored = {"GET_INPUT"}
+    simulator.mask = 0b0001
+    with patch("custom_components.kincony_kc868_tcp.DEFAULT_TIMEOUT", 0.1):
+        await setup_entry(simulator.port, 4, {CONF_INPUT_COUNT: 4})
+
+    assert hass.states.get("switch.relay_1").state == STATE_ON
+    assert hass.states.get("binary_sensor.input_1").state == STATE_UNAVAILABLE
@@ -0,0 +1,269 @@
+"""Client tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.kincony_kc868_tcp import KinconyClient, PollDropped, Priority
+from custom_components.kincony_kc868_tcp.const import INPUT_READ_ATTEMPTS
+from custom_components.kincony_kc868_tcp.metrics import TransportMetrics
+from custom_components.kincony_kc868_tcp.protocol import Command, Frame, parse_frame
+
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations")
+
+
+class _FakeTransport:
+    def __init__(self, responses: dict[str, str]) -> None:
+        self.responses = responses
+        self.commands: list[str] = []
+        self.priorities: list[Priority] = []
+        self.listeners: list[Callable[[Frame], None]] = []
+        self.connect_listeners: list[Callable[[], None]] = []
+        self.metrics = TransportMetrics()
+        self.connected = True
+
+    def add_listener(self, listener: Callable[[Frame], None]) -> Callable[[], None]:
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def add_connect_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        self.connect_listeners.append(listener)
+        return lambda: self.connect_listeners.remove(listener)
+
+    def reconnect(self) -> None:
+        for listener in self.connect_listeners:
+            listener()
+
+    def push(self, raw: str) -> None:
+        frame = parse_frame(raw)
+        assert frame is not None
+        for listener in self.listeners:
+            listener(frame)
+
+    async def call(
+        self,
+        command: Command,
+        priority: Priority = Priority.INTERACTIVE,
+        *,
+        on_sent: Callable[[float], None] | None = None,
+    ) -> Frame:
+        if on_sent is not None:
+            on_sent(asyncio.get_running_loop().time())
+        self.commands.append(command.payload)
+        self.priorities.append(priority)
+        default = "RELAY-ERROR"
+        if command.payload.startswith("RELAY-SET"):
+            default = f"{command.payload},OK"
+        frame = parse_frame(self.responses.get(command.payload, default))
+        assert frame is not None
+        return frame
+
+    def close(self) -> None:
+        return None
+
+
+def _make_client(
+    hass: Any, transport: _FakeTransport, channel_count: int
+) -> KinconyClient:
+    with patch(
+        "custom_components.kincony_kc868_tcp.KTransport", return_value=transport
+    ):
+        return KinconyClient(hass, "1.2.3.4", 4196, channel_count)
+
+
+@pytest.mark.asyncio
+async def test_get_states_uses_single_bulk_read(hass: Any) -> None:
+    """Relay states come from one RELAY-STATE request, relay 1 in bit 0."""
+    channel_count = 16
+    transport = _FakeTransport({"RELAY-STATE-255": "RELAY-STATE-255,0,5,OK"})
+    client = _make_client(hass, transport, channel_count)
+
+    states = await client.async_get_states()
+
+    assert transport.commands == ["RELAY-STATE-255"]
+    assert [channel for channel, on in states.items() if on] == [1, 3]
+    assert len(states) == channel_count
+
+
+@pytest.mark.asyncio
+async def test_get_states_falls_back_to_per_channel(hass: Any) -> None:
+    """Firmware without RELAY-STATE is read channel by channel from then on."""
+    transport = _FakeTransport(
+        {
+            "RELAY-READ-255,1": "RELAY-READ-255,1,1,OK",
+            "RELAY-READ-255,2": "RELAY-READ-255,2,0,OK",
+        }
+    )
+    client = _make_client(hass, transport, 2)
+
+    assert await client.async_get_states() == {1: True, 2: False}
+    assert await client.async_get_states() == {1: True, 2: False}
+    assert transport.commands.count("RELAY-STATE-255") == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_coalesce_into_set_all(hass: Any) -> None:
+    """A burst of writes is merged with the known state into one frame."""
+    transport = _FakeTransport({"RELAY-STATE-255": "RELAY-STATE-255,0,128,OK"})
+    client = _make_client(hass, transport, 16)
+    await client.async_get_states()
+
+    await asyncio.gather(
+        client.async_turn_on(1),
+        client.async_turn_on(9),
+        client.async_turn_off(8),
+    )
+
+    assert transport.commands == ["RELAY-STATE-255", "RELAY-SET_ALL-255,1,1"]
+
+    await client.async_turn_off(1)
+    assert transport.commands[-1] == "RELAY-SET-255,1,0"
+
+
+@pytest.mark.asyncio
+async def test_set_relays_reads_unknown_board_at_interactive_priority(
+    hass: Any,
+) -> None:
+    """The read before a first set_relays is not queued behind polls."""
+    transport = _FakeTransport({"RELAY-STATE-255": "RELAY-STATE-255,128,OK"})
+    client = _make_client(hass, transport, 8)
+
+    states = await client.async_set_relays({1: True, 2: True})
+
+    assert transport.commands == ["RELAY-STATE-255", "RELAY-SET_ALL-255,131"]
+    assert transport.priorities == [Priority.INTERACTIVE, Priority.INTERACTIVE]
+    assert [channel for channel, on in states.items() if on] == [1, 2, 8]
+
+
+@pytest.mark.asyncio
+async def test_unsolicited_reports_update_listeners(hass: Any) -> None:
+    """Relay changes pushed by the board reach state listeners."""
+    transport = _FakeTransport({"RELAY-STATE-255": "RELAY-STATE-255,0,OK"})
+    client = _make_client(hass, transport, 8)
+    pushed: list[dict[int, bool]] = []
+    client.add_state_listener(pushed.append)
+
+    transport.push("RELAY-SET-255,2,1,OK")
+    assert pushed == []
+
+    await client.async_get_states()
+    transport.push("RELAY-SET-255,2,1,OK")
+    transport.push("RELAY-SET_ALL-255,129,OK")
+
+    assert [channel for channel, on in pushed[0].items() if on] == [2]
+    assert [channel for channel, on in pushed[1].items() if on] == [1, 8]
+
+
+@pytest.mark.asyncio
+async def test_confirmed_states_are_served_from_cache(hass: Any) -> None:
+    """Fresh confirmed states need no read until the connection is reopened."""
+    transport = _FakeTransport(
+        {
+            "RELAY-STATE-255": "RELAY-STATE-255,4,OK",
+            "RELAY-READ-255,3": "RELAY-READ-255,3,1,OK",
+        }
+    )
+    client = _make_client(hass, transport, 8)
+    await client.async_get_states()
+    await client.async_turn_on(1)
+
+    assert await client.async_get_status(1) is True
+    states = await client.async_get_states()
+    assert [channel for channel, on in states.items() if on] == [1, 3]
+    assert transport.commands == ["RELAY-STATE-255", "RELAY-SET-255,1,1"]
+
+    transport.reconnect()
+    assert await client.async_get_status(3) is True
+    assert transport.commands[-1] == "RELAY-READ-255,3"
+
+
+@pytest.mark.asyncio
+async def test_shed_poll_is_answered_from_last_states(hass: Any) -> None:
+    """A poll dropped by a full queue returns the last known states."""
+    transport = _FakeTransport({"RELAY-STATE-255": "RELAY-STATE-255,2,OK"})
+    with patch(
+        "custom_components.kincony_kc868_tcp.KTransport", return_value=transport
+    ):
+        client = KinconyClient(hass, "1.2.3.4", 4196, 8, state_ttl=0)
+
+    with patch.object(transport, "call", side_effect=PollDropped("shed")):
+        with pytest.raises(PollDropped):
+            await client.async_get_states()
+    await client.async_get_states()
+    with patch.object(transport, "call", side_effect=PollDropped("shed")):
+        states = await client.async_get_states()
+    assert [channel for channel, on in states.items() if on] == [2]
+
+
+@pytest.mark.asyncio
+async def test_unanswered_input_reads_are_given_up(hass: Any) -> None:
+    """Firmware that never answers RELAY-GET_INPUT stops being asked."""
+    transport = _FakeTransport({})
+    with patch(
+        "custom_components.kincony_kc868_tcp.KTransport", return_value=transport
+    ):
+        client = KinconyClient(hass, "1.2.3.4", 4196, 8, input_count=8)
+
+    with patch.object(
+        transport, "call", side_effect=ConnectionError("Socket read error")
+    ) as call:
+        for _attempt in range(INPUT_READ_ATTEMPTS):
+            with pytest.raises(ConnectionError):
+                await client.async_get_inputs()
+        assert await client.async_get_inputs() is None
+    assert call.call_count == INPUT_READ_ATTEMPTS
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("socket_enabled")
+async def test_stale_states_are_read_before_a_set_all(
+    hass: Any, simulator: KC868Simulator
+) -> None:
+    """A relay switched elsewhere is not switched back by a coalesced write."""
+    client = KinconyClient(hass, "127.0.0.1", simulator.port, 8, state_ttl=0)
+    try:
+        await client.async_get_states()
+        # Switched by another controller, without a report.
+        simulator.mask |= 0b10000
+        simulator.commands.clear()
+
+        await asyncio.gather(client.async_turn_on(1), client.async_turn_on(2))
+
+        assert simulator.commands == ["RELAY-STATE-255", "RELAY-SET_ALL-255,19"]
+        assert simulator.mask == 0b10011
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("socket_enabled")
+async def test_pulse_is_not_shortened_by_a_command_in_flight(
+    hass: Any, simulator: KC868Simulator
+) -> None:
+    """Waiting for a slow poll to finish does not eat into the pulse."""
+    client = KinconyClient(hass, "127.0.0.1", simulator.port, 8, state_ttl=0)
+    try:
+        await client.async_get_states()
+        simulator.latency = 0.2
+        simulator.commands.clear()
+        poll = asyncio.create_task(client.async_get_states())
+        while not simulator.commands:
+            await asyncio.sleep(0.01)
+
+        await client.async_pulse(3, 0.5)
+        await poll
+
+        (on_at, _, _, on), (off_at, _, _, off) = simulator.switched[-2:]
+        assert simulator.commands[0] == "RELAY-STATE-255"
+        assert (on, off) == (True, False)
+        # The on edge waited most of a 0.2 s round trip for the poll.
+        assert abs(off_at - on_at - 0.5) < 0.05
+    finally:
+        client.close()
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, ClassVar
 from unittest.mock import patch
 
 import pytest
@@ -10,20 +10,32 @@ from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.data_entry_flow import FlowResultType
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.kincony_kc868_tcp.config_flow import KinconyOptionsFlowHandler
 from custom_components.kincony_kc868_tcp.const import (
+    CONF_ADDRESSES,
     CONF_CHANNEL_COUNT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_RATE_LIMIT,
     DEFAULT_CHANNEL_COUNT,
     DOMAIN,
 )
+from custom_components.kincony_kc868_tcp.discovery import DiscoveredBoard
 
 pytestmark = pytest.mark.usefixtures("enable_custom_integrations")
 
 
 class _FakeClientScan:
+    instances: ClassVar[list[_FakeClientScan]] = []
+
     def __init__(self, hass: Any, host: str, port: int) -> None:
         self.host = host
         self.port = port
+        self.closed = False
+        self.instances.append(self)
+
+    @classmethod
+    async def async_get(cls, hass: Any, host: str, port: int) -> _FakeClientScan:
+        return cls(hass, host, port)
 
     async def async_get_channel_count(self) -> int | None:
         return 8
@@ -31,26 +43,22 @@ class _FakeClientScan:
     async def async_ping(self) -> None:
         return None
 
+    def close(self) -> None:
+        self.closed = True
 
-class _FakeClientFallback:
-    def __init__(self, hass: Any, host: str, port: int) -> None:
-        self.host = host
-        self.port = port
 
+class _FakeClientFallback(_FakeClientScan):
     async def async_get_channel_count(self) -> int | None:
         raise RuntimeError("scan failed")
 
-    async def async_ping(self) -> None:
-        return None
-
 
 @pytest.mark.asyncio
 async def test_user_flow_scans_channel_count(hass: Any) -> None:
     """Channel scan succeeds and returns detected count."""
     expected_count = 8
     with patch(
-        "custom_components.kincony_kc868_tcp.config_flow.KinconyClient",
-        _FakeClientScan,
+        "custom_components.kincony_kc868_tcp.config_flow.async_get_client",
+        _FakeClientScan.async_get,
     ):
         result = await hass.config_entries.flow.async_init(
             DOMAIN, context={"source": "user"}
@@ -61,14 +69,15 @@ async def test_user_flow_scans_channel_count(hass: Any) -> None:
         )
         assert result2["type"] == FlowResultType.CREATE_ENTRY
         assert result2["data"][CONF_CHANNEL_COUNT] == expected_count
+        assert _FakeClientScan.instances[-1].closed is True
 
 
 @pytest.mark.asyncio
 async def test_user_flow_falls_back_to_ping(hass: Any) -> None:
     """Falls back to default count when scan fails but ping works."""
     with patch(
-        "custom_components.kincony_kc868_tcp.config_flow.KinconyClient",
-        _FakeClientFallback,
+        "custom_components.kincony_kc868_tcp.config_flow.async_get_client",
+        _FakeClientFallback.async_get,
     ):
         result = await hass.config_entries.flow.async_init(
             DOMAIN, context={"source": "user"}
@@ -94,12 +103,104 @@ async def test_options_flow_preserves_detected_default(hass: Any) -> None:
 
     stored_count = 16
     new_count = 12
-    flow = await KinconyOptionsFlowHandler(entry).async_step_init()
+    flow = await hass.config_entries.options.async_init(entry.entry_id)
     assert flow["type"] == FlowResultType.FORM
     assert flow["data_schema"]({})[CONF_CHANNEL_COUNT] == stored_count
 
-    result2 = await KinconyOptionsFlowHandler(entry).async_step_init(
-        user_input={CONF_CHANNEL_COUNT: new_count}
+    result2 = await hass.config_entries.options.async_configure(
+        flow["flow_id"], user_input={CONF_CHANNEL_COUNT: new_count}
     )
     assert result2["type"] == FlowResultType.CREATE_ENTRY
     assert result2["data"][CONF_CHANNEL_COUNT] == new_count
+
+
+@pytest.mark.asyncio
+async def test_options_flow_is_offered_and_saves_options(hass: Any) -> None:
+    """The entry offers its options, and inverted poll intervals are refused."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "1.2.3.4", CONF_PORT: 4196, CONF_CHANNEL_COUNT: 16},
+        title="Kincony",
+    )
+    entry.add_to_hass(hass)
+    assert entry.supports_options
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_MIN_SCAN_INTERVAL: 600, CONF_MAX_SCAN_INTERVAL: 60},
+    )
+    assert result2["type"] == FlowResultType.FORM
+    assert result2["errors"] == {CONF_MIN_SCAN_INTERVAL: "invalid_scan_interval"}
+
+    result3 = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_MIN_SCAN_INTERVAL: 10, CONF_MAX_SCAN_INTERVAL: 60, CONF_RATE_LIMIT: 5},
+    )
+    assert result3["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_MIN_SCAN_INTERVAL] == 10
+    assert entry.options[CONF_MAX_SCAN_INTERVAL] == 60
+    assert entry.options[CONF_RATE_LIMIT] == 5
+    assert entry.options[CONF_CHANNEL_COUNT] == 16
+    assert entry.options[CONF_ADDRESSES] == [255]
+
+
+@pytest.mark.asyncio
+async def test_user_flow_scans_range_and_offers_boards(hass: Any) -> None:
+    """A range is scanned; the first pick is added, the rest are discovered."""
+    boards = [DiscoveredBoard("10.0.0.1", 16), DiscoveredBoard("10.0.0.2", None)]
+    with patch(
+        "custom_components.kincony_kc868_tcp.config_flow.async_discover",
+        return_value=boards,
+    ) as discover:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": "user"}
+        )
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {CONF_HOST: "10.0.0.0/30", CONF_PORT: 4196},
+        )
+    assert discover.call_args.args == (["10.0.0.1", "10.0.0.2"], 4196)
+    assert result2["type"] == FlowResultType.FORM
+    assert result2["step_id"] == "pick"
+
+    empty = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: []}
+    )
+    assert empty["type"] == FlowResultType.FORM
+    assert empty["errors"] == {"base": "no_boards_selected"}
+
+    result3 = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: ["10.0.0.1", "10.0.0.2"]}
+    )
+    assert result3["type"] == FlowResultType.CREATE_ENTRY
+    assert result3["data"][CONF_CHANNEL_COUNT] == 16
+    await hass.async_block_till_done()
+
+    (discovered,) = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert discovered["step_id"] == "discovery_confirm"
+    result4 = await hass.config_entries.flow.async_configure(
+        discovered["flow_id"], {}
+    )
+    assert result4["type"] == FlowResultType.CREATE_ENTRY
+    assert result4["data"][CONF_HOST] == "10.0.0.2"
+    assert result4["data"][CONF_CHANNEL_COUNT] == DEFAULT_CHANNEL_COUNT
+
+
+@pytest.mark.asyncio
+async def test_user_flow_reports_empty_scan(hass: Any) -> None:
+    """A scan without answers asks again."""
+    with patch(
+        "custom_components.kincony_kc868_tcp.config_flow.async_discover",
+        return_value=[],
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": "user"}
+        )
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {CONF_HOST: "10.0.0.8-10", CONF_PORT: 4196},
+        )
+    assert result2["type"] == FlowResultType.FORM
+    assert result2["errors"] == {"base": "no_boards_found"}
@@ -0,0 +1,82 @@
+"""Coordinator scheduling tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+from typing import Any, cast
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_PORT
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.kincony_kc868_tcp import KinconyClient
+from custom_components.kincony_kc868_tcp.const import (
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    DOMAIN,
+)
+from custom_components.kincony_kc868_tcp.coordinator import KinconyCoordinator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations")
+
+
+class _StubClient:
+    def __init__(self) -> None:
+        self.address: int = 255
+        self.board_id: str = "stub-host"
+        self.channel_count: int = 2
+        self.states: dict[int, bool] = {1: False, 2: False}
+
+    async def async_get_states(self) -> dict[int, bool]:
+        return dict(self.states)
+
+    async def async_get_inputs(self) -> dict[int, bool] | None:
+        return None
+
+
+def _make_coordinator(hass: Any, client: _StubClient) -> KinconyCoordinator:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "stub-host", CONF_PORT: 4196},
+        options={CONF_MIN_SCAN_INTERVAL: 10, CONF_MAX_SCAN_INTERVAL: 80},
+    )
+    entry.add_to_hass(hass)
+    return KinconyCoordinator(hass, entry, cast(KinconyClient, client))
+
+
+def _seconds(coordinator: KinconyCoordinator) -> float:
+    assert coordinator.update_interval is not None
+    return coordinator.update_interval.total_seconds()
+
+
+@pytest.mark.asyncio
+async def test_poll_interval_backs_off_while_quiet(hass: Any) -> None:
+    """Quiet polls double the interval up to the maximum, with jitter."""
+    coordinator = _make_coordinator(hass, _StubClient())
+
+    assert 72 <= _seconds(coordinator) <= 88
+    coordinator.async_note_activity()
+    assert 9 <= _seconds(coordinator) <= 11
+
+    expected = [20, 40, 80, 80]
+    for interval in expected:
+        await coordinator.async_refresh()
+        assert interval * 0.9 <= _seconds(coordinator) <= interval * 1.1
+
+
+@pytest.mark.asyncio
+async def test_poll_interval_speeds_up_on_changes(hass: Any) -> None:
+    """A changed poll or a pushed report returns to the minimum interval."""
+    client = _StubClient()
+    coordinator = _make_coordinator(hass, client)
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert _seconds(coordinator) >= 72
+
+    client.states[2] = True
+    await coordinator.async_refresh()
+    assert _seconds(coordinator) <= 11
+
+    await coordinator.async_refresh()
+    assert _seconds(coordinator) >= 18
+    coordinator.async_set_updated_data({1: True, 2: True})
+    assert _seconds(coordinator) <= 11
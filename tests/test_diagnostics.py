@@ -0,0 +1,50 @@
+"""Diagnostics and instrumentation tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from homeassistant.const import CONF_HOST
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.kincony_kc868_tcp.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from .conftest import SetupEntry
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled")
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_report_transport_metrics(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """Commands are timed per kind and dumped without the board address."""
+    entry = await setup_entry(simulator.port)
+
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": "switch.relay_2"}, blocking=True
+    )
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"][CONF_HOST] == "**REDACTED**"
+    board = diagnostics["boards"][255]
+    assert board["bulk_read_supported"] is True
+    assert board["relays"][2] is True
+    transport = diagnostics["transport"]
+    assert transport["commands"]["STATE"]["latency"]["count"] == 1
+    assert transport["commands"]["SET"]["latency"]["count"] == 1
+    assert transport["commands"]["SET"]["errors"] == 0
+    assert transport["bytes_sent"] == len(
+        "RELAY-STATE-255RELAY-GET_INPUT-255RELAY-SET-255,2,1"
+    )
+    assert transport["bytes_received"] > 0
+    assert transport["queue_depth"] == 0
+
+    registry = er.async_get(hass)
+    sensor = registry.async_get("sensor.command_latency_p95")
+    assert sensor is not None
+    assert sensor.disabled_by is er.RegistryEntryDisabler.INTEGRATION
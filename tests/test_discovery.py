@@ -0,0 +1,66 @@
+"""Discovery tests for Kincony KC868 TCP against the KC868 simulator."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.kincony_kc868_tcp.discovery import (
+    DiscoveredBoard,
+    async_discover,
+    parse_host_range,
+)
+
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+def test_parse_host_range() -> None:
+    """Subnets and ranges expand to hosts; single hosts are left alone."""
+    assert parse_host_range("10.0.0.0/30") == ["10.0.0.1", "10.0.0.2"]
+    assert parse_host_range("10.0.0.8-10") == ["10.0.0.8", "10.0.0.9", "10.0.0.10"]
+    assert parse_host_range("10.0.0.255-10.0.1.0") == ["10.0.0.255", "10.0.1.0"]
+    assert parse_host_range("10.0.0.5") is None
+    assert parse_host_range("kc868-1.local") is None
+    with pytest.raises(ValueError):
+        parse_host_range("10.0.0.0/16")
+    with pytest.raises(ValueError):
+        parse_host_range("10.0.0.9-8")
+
+
+@pytest.mark.asyncio
+async def test_discover_finds_answering_boards() -> None:
+    """Only addresses where a board answers the scan are reported."""
+    simulator = KC868Simulator(channel_count=16)
+    await simulator.start()
+    port = simulator.port
+    try:
+        boards = await async_discover(["127.0.0.1"], port, timeout=0.5)
+    finally:
+        await simulator.stop()
+
+    assert boards == [DiscoveredBoard("127.0.0.1", 16)]
+    assert simulator.commands == ["RELAY-SCAN_DEVICE-NOW"]
+    # Nothing listens there any more.
+    assert await async_discover(["127.0.0.1"], port, timeout=0.5) == []
+
+
+@pytest.mark.asyncio
+async def test_discover_skips_silent_listeners() -> None:
+    """A service that accepts the connection but never answers is no board."""
+
+    async def _silent(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(_silent, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        assert await async_discover(["127.0.0.1"], port, timeout=0.2) == []
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,134 @@
+"""Setup tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import State
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import mock_restore_cache
+
+from custom_components.kincony_kc868_tcp.const import (
+    CONF_ADDRESSES,
+    CONF_INPUT_COUNT,
+    DOMAIN,
+)
+
+from .conftest import SetupEntry
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled")
+
+
+@pytest.mark.asyncio
+async def test_setup_does_not_wait_for_the_board(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """An unreachable board sets up at once and fills in when it appears."""
+    port = simulator.port
+    await simulator.stop()
+    simulator.mask = 0b0100
+
+    with (
+        patch("custom_components.kincony_kc868_tcp.RECONNECT_MIN_DELAY", 0.05),
+        patch("custom_components.kincony_kc868_tcp.RECONNECT_MAX_DELAY", 0.1),
+    ):
+        entry = await setup_entry(port, 4, wait=False)
+        await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.LOADED
+        assert hass.states.get("switch.relay_3").state == STATE_UNAVAILABLE
+        assert len(hass.states.async_entity_ids("switch")) == 4
+
+        await simulator.start(port)
+        async with asyncio.timeout(2):
+            while hass.states.get("switch.relay_3").state != STATE_ON:
+                await asyncio.sleep(0.01)
+        assert simulator.commands == ["RELAY-STATE-255", "RELAY-GET_INPUT-255"]
+
+
+@pytest.mark.asyncio
+async def test_restored_states_are_reconciled_by_one_read(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """Switches show their last state, unconfirmed, until the board answers."""
+    # The reply is slow enough to look at the switches before it arrives.
+    simulator.latency = 0.2
+    mock_restore_cache(
+        hass,
+        [State("switch.relay_1", STATE_ON), State("switch.relay_2", STATE_OFF)],
+    )
+
+    await setup_entry(simulator.port, 4, wait=False)
+    relay_1 = hass.states.get("switch.relay_1")
+    assert relay_1.state == STATE_ON
+    assert relay_1.attributes["unconfirmed"] is True
+    assert hass.states.get("switch.relay_2").state == STATE_OFF
+    assert hass.states.get("switch.relay_3").state == STATE_UNAVAILABLE
+
+    async with asyncio.timeout(2):
+        while hass.states.get("switch.relay_1").state != STATE_OFF:
+            await asyncio.sleep(0.01)
+    assert "unconfirmed" not in hass.states.get("switch.relay_1").attributes
+    assert hass.states.get("switch.relay_3").state == STATE_OFF
+    assert simulator.commands == ["RELAY-STATE-255", "RELAY-GET_INPUT-255"]
+
+
+@pytest.mark.asyncio
+async def test_boards_behind_one_gateway_share_a_connection(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """Each address is its own device but all of them use one socket."""
+    simulator.masks = {1: 0b0001, 2: 0b0010}
+    await setup_entry(
+        simulator.port, 4, {CONF_ADDRESSES: [1, 2], CONF_INPUT_COUNT: 0}
+    )
+    registry = er.async_get(hass)
+
+    def state(address: int, channel: int) -> str:
+        entity_id = registry.async_get_entity_id(
+            "switch", DOMAIN, f"127.0.0.1-{address}-relay-{channel}"
+        )
+        assert entity_id is not None
+        return hass.states.get(entity_id).state
+
+    assert simulator.connections == 1
+    assert sorted(simulator.commands) == ["RELAY-STATE-1", "RELAY-STATE-2"]
+    assert (state(1, 1), state(1, 2)) == (STATE_ON, STATE_OFF)
+    assert (state(2, 1), state(2, 2)) == (STATE_OFF, STATE_ON)
+
+    simulator.report(3, True, address=2)
+    async with asyncio.timeout(2):
+        while state(2, 3) != STATE_ON:
+            await asyncio.sleep(0.01)
+    assert state(1, 3) == STATE_OFF
+
+
+@pytest.mark.asyncio
+async def test_addresses_set_in_options_reload_the_entry(
+    hass: Any, simulator: KC868Simulator, setup_entry: SetupEntry
+) -> None:
+    """Listing gateway addresses in the options serves those boards."""
+    simulator.masks = {1: 0b0001, 2: 0b0010}
+    entry = await setup_entry(simulator.port, 4, {CONF_INPUT_COUNT: 0})
+    assert list(hass.data[DOMAIN][entry.entry_id]) == [255]
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_ADDRESSES: "1, 2"}
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    coordinators = hass.data[DOMAIN][entry.entry_id]
+    assert list(coordinators) == [1, 2]
+    async with asyncio.timeout(2):
+        while any(c.data is None for c in coordinators.values()):
+            await asyncio.sleep(0.01)
+    assert coordinators[2].data[2] is True
@@ -0,0 +1,71 @@
+"""Protocol codec tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.kincony_kc868_tcp.protocol import (
+    FrameParser,
+    ProtocolError,
+    parse_channel_count,
+    parse_frame,
+    parse_relay_read,
+    parse_relay_state,
+    relay_read,
+    relay_set,
+)
+
+
+def _feed(parser: FrameParser, data: bytes) -> list[str]:
+    buffer = parser.get_buffer()
+    buffer[: len(data)] = data
+    return parser.buffer_updated(len(data))
+
+
+def test_parser_joins_split_frames() -> None:
+    """A frame delivered in pieces is only emitted once complete."""
+    parser = FrameParser()
+    assert _feed(parser, b"RELAY-READ-255,") == []
+    assert _feed(parser, b"3,1,O") == []
+    assert _feed(parser, b"K") == ["RELAY-READ-255,3,1,OK"]
+
+
+def test_parser_splits_merged_frames() -> None:
+    """Several frames in one read come out separately, in order."""
+    parser = FrameParser()
+    frames = _feed(
+        parser,
+        b"RELAY-SET-255,1,1,OKHOST-TEST-START\r\nRELAY-READ-255,2,0,OKRELAY-",
+    )
+    assert frames == [
+        "RELAY-SET-255,1,1,OK",
+        "HOST-TEST-START",
+        "RELAY-READ-255,2,0,OK",
+    ]
+    assert _feed(parser, b"STATE-255,1,0,ERROR") == ["RELAY-STATE-255,1,0,ERROR"]
+
+
+def test_commands_only_match_their_own_reply() -> None:
+    """A late reply for another channel or board is never taken as ours."""
+    frame = parse_frame("RELAY-READ-255,3,1,OK")
+    assert frame is not None
+    assert relay_read(255, 3).matches(frame)
+    assert not relay_read(255, 4).matches(frame)
+    assert not relay_read(1, 3).matches(frame)
+    assert not relay_set(255, 3, True).matches(frame)
+    assert parse_relay_read(frame) is True
+
+
+def test_reply_parsers() -> None:
+    """Bulk state and scan replies decode into numbers."""
+    expected_count = 16
+    state = parse_frame("RELAY-STATE-255,1,0,0,128,OK")
+    scan = parse_frame("RELAY-SCAN_DEVICE-CHANNEL_16,OK")
+    error = parse_frame("RELAY-STATE-255,ERROR")
+    assert state is not None
+    assert scan is not None
+    assert error is not None
+    assert parse_relay_state(state) == (1 << 24) | 128
+    assert parse_channel_count(scan) == expected_count
+    with pytest.raises(ProtocolError):
+        parse_relay_state(error)
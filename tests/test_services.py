@@ -0,0 +1,104 @@
+"""Service tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.kincony_kc868_tcp.const import (
+    DOMAIN,
+    SERVICE_PULSE,
+    SERVICE_SET_RELAYS,
+)
+
+from .conftest import SetupEntry
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled")
+
+
+@pytest.fixture
+def channel_count() -> int:
+    return 16
+
+
+@pytest.fixture
+async def entry(
+    simulator: KC868Simulator, setup_entry: SetupEntry
+) -> MockConfigEntry:
+    simulator.mask = 0x8000
+    return await setup_entry(simulator.port, 16)
+
+
+@pytest.mark.asyncio
+async def test_set_relays_sends_one_frame(
+    hass: Any, entry: MockConfigEntry, simulator: KC868Simulator
+) -> None:
+    """A relay map or a bitmask switches the board with one RELAY-SET_ALL."""
+    simulator.commands.clear()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_RELAYS,
+        {"config_entry_id": entry.entry_id, "relays": {"1": True, "2": "on"}},
+        blocking=True,
+    )
+    # Relays that are not listed keep their state.
+    assert simulator.commands == ["RELAY-SET_ALL-255,128,3"]
+    assert hass.states.get("switch.relay_2").state == STATE_ON
+    assert hass.states.get("switch.relay_16").state == STATE_ON
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_RELAYS,
+        {"config_entry_id": entry.entry_id, "mask": 0xFF00},
+        blocking=True,
+    )
+    assert simulator.commands[-1] == "RELAY-SET_ALL-255,255,0"
+    assert hass.states.get("switch.relay_2").state == STATE_OFF
+    assert hass.states.get("switch.relay_9").state == STATE_ON
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_RELAYS,
+            {"config_entry_id": entry.entry_id, "relays": {"17": True}},
+            blocking=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_pulse_reports_drift(
+    hass: Any, entry: MockConfigEntry, simulator: KC868Simulator
+) -> None:
+    """The relay is on for the requested time and the drift is reported."""
+    simulator.latency = 0.02
+    simulator.commands.clear()
+    events = async_capture_events(hass, "state_changed")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PULSE,
+        {"config_entry_id": entry.entry_id, "relay": 3, "duration": 0.2},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert simulator.commands == ["RELAY-SET-255,3,1", "RELAY-SET-255,3,0"]
+    seen = [
+        event.data["new_state"].state
+        for event in events
+        if event.data["entity_id"] == "switch.relay_3"
+    ]
+    assert seen == [STATE_ON, STATE_OFF]
+    assert response is not None
+    assert response["requested_ms"] == 200
+    # Generous, so a loaded CI runner does not fail the test.
+    assert abs(response["drift_ms"]) < 100
@@ -0,0 +1,180 @@
+"""Soak test of the client through a fault-injecting proxy.
+
+Run with ``pytest -m soak -s`` to see the summary; KINCONY_SOAK_SECONDS
+sets how long traffic is driven through the faults.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.kincony_kc868_tcp import KinconyClient, KTransport
+
+from .fault_proxy import FaultProxy
+from .simulator import KC868Simulator
+
+pytestmark = [
+    pytest.mark.soak,
+    pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled"),
+]
+
+SOAK_SECONDS = float(os.environ.get("KINCONY_SOAK_SECONDS", "3"))
+# Reply timeout while soaking, so dropped replies cost little time.
+REPLY_TIMEOUT = 0.3
+# No caller may go longer than this without a successful command.
+MAX_OUTAGE = 2.0
+# Relays 1-8 are switched by writers; relays 9-16 hold this fixed pattern
+# and are only read, so a reply routed to the wrong command shows up.
+WRITTEN = range(1, 9)
+READ = range(9, 17)
+PATTERN = 0b10100110 << 8
+
+
+class _Soak:
+    """Drive callers through the client and track successes and outages."""
+
+    def __init__(self, client: KinconyClient) -> None:
+        self.client = client
+        self.successes = 0
+        self.failures = 0
+        self.mismatches: list[str] = []
+        self.last_success = time.perf_counter()
+        self.max_outage = 0.0
+
+    async def run(self, call: Callable[[], Awaitable[None]], until: float) -> None:
+        while time.perf_counter() < until:
+            try:
+                await call()
+            except ConnectionError:
+                self.failures += 1
+                await asyncio.sleep(0.01)
+                continue
+            now = time.perf_counter()
+            self.max_outage = max(self.max_outage, now - self.last_success)
+            self.last_success = now
+            self.successes += 1
+
+    def writer(self, channel: int) -> Callable[[], Awaitable[None]]:
+        async def _write() -> None:
+            await self.client.async_turn_on(channel)
+            await self.client.async_turn_off(channel)
+
+        return _write
+
+    def reader(self, channel: int) -> Callable[[], Awaitable[None]]:
+        async def _read() -> None:
+            state = await self.client.async_get_status(channel)
+            if state is not _expected(channel):
+                self.mismatches.append(f"relay {channel} read {state}")
+
+        return _read
+
+    async def poll(self) -> None:
+        states = await self.client.async_get_states()
+        wrong = [
+            channel for channel in READ if states[channel] is not _expected(channel)
+        ]
+        if wrong:
+            self.mismatches.append(f"poll got relays {wrong} wrong")
+
+    async def recover(self) -> float:
+        """Return how long it takes until a poll succeeds again."""
+        started = time.perf_counter()
+        while True:
+            try:
+                await self.poll()
+            except ConnectionError:
+                await asyncio.sleep(0.01)
+            else:
+                return time.perf_counter() - started
+
+
+def _expected(channel: int) -> bool:
+    return bool(PATTERN >> (channel - 1) & 1)
+
+
+async def _reset_now_and_then(proxy: FaultProxy, until: float) -> None:
+    while time.perf_counter() < until:
+        await asyncio.sleep(0.4)
+        proxy.reset()
+
+
+@pytest.mark.asyncio
+async def test_client_survives_faults(hass: Any) -> None:
+    """Concurrent polls and writes recover from faults and never get a
+    reply meant for another command; nothing leaks afterwards.
+    """
+    threads = set(threading.enumerate())
+    simulator = KC868Simulator(channel_count=16)
+    simulator.mask = PATTERN
+    await simulator.start()
+    proxy = FaultProxy(simulator.port, seed=868)
+    await proxy.start()
+    proxy.latency = 0.005
+    proxy.drop_rate = 0.03
+    proxy.split = True
+    proxy.accept_delay = 0.05
+
+    with (
+        patch("custom_components.kincony_kc868_tcp.DEFAULT_TIMEOUT", REPLY_TIMEOUT),
+        patch("custom_components.kincony_kc868_tcp.RECONNECT_MIN_DELAY", 0.05),
+        patch("custom_components.kincony_kc868_tcp.RECONNECT_MAX_DELAY", 0.2),
+    ):
+        transport = KTransport("127.0.0.1", proxy.port)
+        client = KinconyClient(
+            hass,
+            "127.0.0.1",
+            proxy.port,
+            16,
+            write_window=0,
+            state_ttl=0,
+            transport=transport,
+        )
+        soak = _Soak(client)
+        maintain = asyncio.create_task(transport.async_maintain())
+        until = time.perf_counter() + SOAK_SECONDS
+        try:
+            await asyncio.gather(
+                *(soak.run(soak.writer(channel), until) for channel in WRITTEN),
+                *(soak.run(soak.reader(channel), until) for channel in READ),
+                soak.run(soak.poll, until),
+                _reset_now_and_then(proxy, until),
+            )
+            # Recovery after a reset with faults switched off is bounded.
+            proxy.drop_rate = 0.0
+            proxy.reset()
+            recovery = await soak.recover()
+        finally:
+            maintain.cancel()
+            await asyncio.gather(maintain, return_exceptions=True)
+            client.close()
+
+    print(
+        f"\nsoak: {soak.successes} ok, {soak.failures} failed, "
+        f"{proxy.dropped} replies dropped, {proxy.resets} resets, "
+        f"longest outage {soak.max_outage * 1000:.0f}ms, "
+        f"recovery {recovery * 1000:.0f}ms"
+    )
+    try:
+        assert soak.mismatches == []
+        assert soak.successes > 0
+        assert proxy.resets > 0
+        assert soak.max_outage < MAX_OUTAGE
+        assert recovery < MAX_OUTAGE
+        assert transport.metrics.parse_failures == 0
+
+        async with asyncio.timeout(1):
+            while proxy.connections or simulator.connections:
+                await asyncio.sleep(0.01)
+        assert set(threading.enumerate()) <= threads
+    finally:
+        await proxy.stop()
+        await simulator.stop()
@@ -0,0 +1,90 @@
+"""Relay switching statistics tests for Kincony KC868 TCP."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from custom_components.kincony_kc868_tcp.const import CONF_INPUT_COUNT, DOMAIN
+from custom_components.kincony_kc868_tcp.stats import RelayStats
+
+from .conftest import SetupEntry
+from .simulator import KC868Simulator
+
+
+def test_cycles_and_on_time_follow_confirmed_masks() -> None:
+    """Only off-to-on transitions count, and on-time includes the current run."""
+    changes: list[None] = []
+    stats = RelayStats(on_change=lambda: changes.append(None))
+
+    # Relays already on at the first read were not seen switching.
+    stats.observe(0b01, 100.0)
+    assert stats.cycles == {}
+    stats.observe(0b01, 110.0)
+    assert len(changes) == 1
+
+    stats.observe(0b10, 130.0)
+    stats.observe(0b11, 140.0)
+    assert stats.cycles == {2: 1, 1: 1}
+    assert stats.on_seconds == {1: 30.0}
+    assert stats.on_time(1, 150.0) == 40.0
+    assert stats.on_time(2, 150.0) == 20.0
+    assert stats.on_time(3, 150.0) == 0.0
+    assert len(changes) == 3
+
+
+def test_counters_round_trip_through_storage() -> None:
+    """Saved counters include running relays and restore with integer keys."""
+    stats = RelayStats()
+    stats.observe(0b0, 0.0)
+    stats.observe(0b1, 10.0)
+    stats.observe(0b0, 20.0)
+    stats.observe(0b1, 30.0)
+
+    saved = stats.as_dict(35.04)
+    assert saved == {"cycles": {1: 2}, "on_seconds": {1: 15.0}}
+    # JSON turns the keys into strings.
+    restored = RelayStats.from_dict(
+        {key: {str(k): v for k, v in value.items()} for key, value in saved.items()}
+    )
+    assert restored.cycles == {1: 2}
+    assert restored.on_time(1, 100.0) == 15.0
+    assert RelayStats.from_dict(None).cycles == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled")
+async def test_statistics_survive_a_reload(
+    hass: Any,
+    hass_storage: dict[str, Any],
+    simulator: KC868Simulator,
+    setup_entry: SetupEntry,
+) -> None:
+    """Counters are restored on setup and saved again on unload."""
+    entry_id = "stats-entry"
+    key = f"{DOMAIN}.{entry_id}.stats"
+    hass_storage[key] = {
+        "version": 1,
+        "key": key,
+        "data": {"127.0.0.1": {"cycles": {"2": 5}, "on_seconds": {"2": 60.0}}},
+    }
+    entry = await setup_entry(
+        simulator.port, 2, {CONF_INPUT_COUNT: 0}, entry_id=entry_id
+    )
+    coordinator = hass.data[DOMAIN][entry.entry_id][255]
+    assert coordinator.client.stats.cycles == {2: 5}
+
+    await coordinator.client.async_turn_on(2)
+    await coordinator.client.async_turn_off(2)
+    assert coordinator.client.stats.cycles == {2: 6}
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    saved = hass_storage[key]["data"]["127.0.0.1"]
+    assert saved["cycles"] == {"2": 6}
+    assert saved["on_seconds"]["2"] >= 60.0
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert key not in hass_storage
@@ -5,9 +5,13 @@ from __future__ import annotations
 from typing import Any, cast
 
 import pytest
+from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.kincony_kc868_tcp import KinconyClient
+from custom_components.kincony_kc868_tcp.const import DOMAIN
+from custom_components.kincony_kc868_tcp.coordinator import KinconyCoordinator
 from custom_components.kincony_kc868_tcp.switch import KinconySwitch
 
 pytestmark = pytest.mark.usefixtures("enable_custom_integrations")
@@ -16,16 +20,26 @@ pytestmark = pytest.mark.usefixtures("enable_custom_integrations")
 class _StubClient:
     def __init__(self, *, fail: bool = False) -> None:
         self.host: str = "stub-host"
+        self.address: int = 255
+        self.board_id: str = self.host
+        self.channel_count: int = 4
         self._fail: bool = fail
         self.turn_on_called: bool = False
         self.turn_off_called: bool = False
-        self.status_calls: int = 0
+        self.states_calls: int = 0
+        self.states_override: dict[int, bool] = {}
 
-    async def async_get_status(self, channel: int) -> bool:
-        self.status_calls += 1
+    async def async_get_states(self) -> dict[int, bool]:
+        self.states_calls += 1
         if self._fail:
             raise RuntimeError("status failed")
-        return channel % 2 == 0
+        return {
+            channel: self.states_override.get(channel, channel % 2 == 0)
+            for channel in range(1, self.channel_count + 1)
+        }
+
+    async def async_get_inputs(self) -> dict[int, bool] | None:
+        return None
 
     async def async_turn_on(self, channel: int) -> None:
         if self._fail:
@@ -38,19 +52,32 @@ class _StubClient:
         self.turn_off_called = True
 
 
+def _make_switch(hass: Any, client: _StubClient, channel: int) -> KinconySwitch:
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: client.host, CONF_PORT: 4196}
+    )
+    entry.add_to_hass(hass)
+    coordinator = KinconyCoordinator(hass, entry, cast(KinconyClient, client))
+    switch = KinconySwitch(coordinator, channel=channel)
+    switch.hass = hass
+    switch.entity_id = f"switch.relay_{channel}"
+    return switch
+
+
 @pytest.mark.asyncio
 async def test_update_marks_availability(hass: Any) -> None:
-    """Update sets availability based on polling success."""
+    """One bulk read feeds every switch and drives availability."""
     client = _StubClient()
-    switch = KinconySwitch(cast(KinconyClient, client), channel=2)
+    switch = _make_switch(hass, client, channel=2)
 
-    await switch.async_update()
+    await switch.coordinator.async_refresh()
+    assert client.states_calls == 1
     assert switch.available is True
     assert switch.is_on is True
 
     client_fail = _StubClient(fail=True)
-    switch_fail = KinconySwitch(cast(KinconyClient, client_fail), channel=1)
-    await switch_fail.async_update()
+    switch_fail = _make_switch(hass, client_fail, channel=1)
+    await switch_fail.coordinator.async_refresh()
     assert switch_fail.available is False
 
 
@@ -58,7 +85,8 @@ async def test_update_marks_availability(hass: Any) -> None:
 async def test_turn_on_off_propagate_errors(hass: Any) -> None:
     """Turn on/off handle failures and availability flags."""
     client = _StubClient()
-    switch = KinconySwitch(cast(KinconyClient, client), channel=3)
+    switch = _make_switch(hass, client, channel=3)
+    await switch.coordinator.async_refresh()
 
     await switch.async_turn_on()
     assert client.turn_on_called is True
@@ -71,7 +99,47 @@ async def test_turn_on_off_propagate_errors(hass: Any) -> None:
     assert switch.available is True
 
     failing_client = _StubClient(fail=True)
-    failing_switch = KinconySwitch(cast(KinconyClient, failing_client), channel=4)
+    failing_switch = _make_switch(hass, failing_client, channel=4)
     with pytest.raises(HomeAssistantError):
         await failing_switch.async_turn_on()
     assert failing_switch.available is False
+
+
+@pytest.mark.asyncio
+async def test_polls_write_state_only_on_change(hass: Any) -> None:
+    """Quiet polls leave the state machine alone; changes and outages do not."""
+    client = _StubClient()
+    switch = _make_switch(hass, client, channel=2)
+    coordinator = switch.coordinator
+    other = KinconySwitch(coordinator, channel=3)
+    other.hass = hass
+    other.entity_id = "switch.relay_3"
+    writes: list[str] = []
+    removers = []
+    for entity in (switch, other):
+        removers.append(
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+        )
+        entity._async_write_ha_state = (  # type: ignore[method-assign]
+            lambda entity=entity: writes.append(entity.entity_id)
+        )
+
+    await coordinator.async_refresh()
+    assert writes == ["switch.relay_2", "switch.relay_3"]
+
+    writes.clear()
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert writes == []
+
+    client.states_override = {2: False}
+    await coordinator.async_refresh()
+    assert writes == ["switch.relay_2"]
+
+    writes.clear()
+    client._fail = True
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert writes == ["switch.relay_2", "switch.relay_3"]
+    for remove in removers:
+        remove()
@@ -0,0 +1,360 @@
+"""Transport tests for Kincony KC868 TCP against the KC868 simulator."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.kincony_kc868_tcp import (
+    KTransport,
+    OverflowPolicy,
+    PollDropped,
+    Priority,
+    TransportLimits,
+    async_acquire_transport,
+    release_transport,
+)
+from custom_components.kincony_kc868_tcp.protocol import (
+    relay_read,
+    relay_set,
+    relay_state,
+)
+
+from .simulator import KC868Simulator
+
+pytestmark = pytest.mark.usefixtures("enable_custom_integrations", "socket_enabled")
+
+
+async def _blackholed_connect(*_args: Any, **_kwargs: Any) -> Any:
+    await asyncio.sleep(0.3)
+    raise TimeoutError
+
+
+@pytest.mark.asyncio
+async def test_reconnects_in_background_and_fails_fast(
+    hass: Any, simulator: KC868Simulator
+) -> None:
+    """While the board is gone commands fail at once; it comes back by itself."""
+    port = simulator.port
+    transport = KTransport("127.0.0.1", port)
+    with (
+        patch("custom_components.kincony_kc868_tcp.RECONNECT_MIN_DELAY", 0.05),
+        patch("custom_components.kincony_kc868_tcp.RECONNECT_MAX_DELAY", 0.1),
+    ):
+        task = asyncio.create_task(transport.async_maintain())
+        try:
+            await transport.call(relay_read(255, 1))
+
+            await simulator.stop()
+            while transport.connected:
+                await asyncio.sleep(0.01)
+            # Commands queued right after the drop pay for one connect that
+            # runs into its timeout between them, not for one each.
+            with patch.object(
+                asyncio.get_running_loop(),
+                "create_connection",
+                side_effect=_blackholed_connect,
+            ):
+                start = time.perf_counter()
+                results = await asyncio.gather(
+                    *(transport.call(relay_read(255, ch)) for ch in range(1, 7)),
+                    return_exceptions=True,
+                )
+                assert time.perf_counter() - start < 0.9
+            assert all(isinstance(result, ConnectionError) for result in results)
+            assert transport._link_down
+            # Let the background attempt that started meanwhile run out.
+            while transport.lock.locked():
+                await asyncio.sleep(0.01)
+
+            start = time.perf_counter()
+            with pytest.raises(ConnectionError):
+                await transport.call(relay_read(255, 1))
+            assert time.perf_counter() - start < 0.05
+
+            await simulator.start(port)
+            while not transport.connected:
+                await asyncio.sleep(0.01)
+            frame = await transport.call(relay_read(255, 2))
+            assert frame.raw == "RELAY-READ-255,2,0,OK"
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            transport.close()
+
+
+@pytest.mark.asyncio
+async def test_keepalive_probes_idle_link(hass: Any, simulator: KC868Simulator) -> None:
+    """An idle connection is probed with RELAY-TEST-NOW."""
+    transport = KTransport("127.0.0.1", simulator.port)
+    with patch("custom_components.kincony_kc868_tcp.KEEPALIVE_INTERVAL", 0.05):
+        task = asyncio.create_task(transport.async_maintain())
+        try:
+            while simulator.commands.count("RELAY-TEST-NOW") < 2:
+                await asyncio.sleep(0.01)
+            assert transport.connected
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            transport.close()
+
+
+@pytest.mark.asyncio
+async def test_keepalive_probe_is_not_turned_away_by_a_full_queue(
+    hass: Any, simulator: KC868Simulator
+) -> None:
+    """A probe due while the queue is full waits its turn instead of failing."""
+    simulator.latency = 0.3
+    transport = KTransport(
+        "127.0.0.1",
+        simulator.port,
+        TransportLimits(queue_size=1, overflow=OverflowPolicy.REJECT),
+    )
+    with patch("custom_components.kincony_kc868_tcp.KEEPALIVE_INTERVAL", 0.1):
+        task = asyncio.create_task(transport.async_maintain())
+        try:
+            async with asyncio.timeout(2):
+                while not transport.connected:
+                    await asyncio.sleep(0.01)
+                # One write on the wire and one queued fill the queue.
+                await asyncio.gather(
+                    transport.call(relay_set(255, 1, True)),
+                    transport.call(relay_set(255, 2, True)),
+                )
+                while "RELAY-TEST-NOW" not in simulator.commands:
+                    await asyncio.sleep(0.01)
+                while transport.lock.locked():
+                    await asyncio.sleep(0.01)
+            assert transport.metrics.commands_rejected == 0
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            transport.close()
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_one_connection(
+    hass: Any, simulator: KC868Simulator
+) -> None:
+    """Users of the same board share one socket until the last one leaves."""
+    first = await async_acquire_transport(hass, "127.0.0.1", simulator.port)
+    second = await async_acquire_transport(hass, "127.0.0.1", simulator.port)
+    assert first is second
+    await first.call(relay_read(255, 1))
+    assert simulator.connections == 1
+
+    release_transport(hass, first)
+    release_transport(hass, second)
+    assert first.connected
+
+    again = await async_acquire_transport(hass, "127.0.0.1", simulator.port)
+    assert again is first
+    release_transport(hass, again)
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+    assert not first.connected
+
+
+@pytest.mark.asyncio
+async def test_interactive_commands_overtake_queued_polls(
+    simulator: KC868Simulator,
+) -> None:
+    """A switch press waits for the command on the wire, not for every poll."""
+    simulator.latency = 0.01
+    transport = KTransport("127.0.0.1", simulator.port)
+    try:
+        polls = [
+            asyncio.create_task(transport.call(relay_read(255, channel), Priority.POLL))
+            for channel in range(1, 5)
+        ]
+        states = [
+            asyncio.create_task(transport.call(relay_state(255), Priority.POLL))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        await transport.call(relay_set(255, 8, True))
+        assert simulator.commands[:2] == ["RELAY-READ-255,1", "RELAY-SET-255,8,1"]
+
+        await asyncio.gather(*polls)
+        frames = await asyncio.gather(*states)
+        assert simulator.commands.count("RELAY-STATE-255") == 1
+        assert all(frame.raw == "RELAY-STATE-255,128,OK" for frame in frames)
+        assert transport.metrics.polls_shared == 2
+    finally:
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_spaces_commands_after_burst(
+    simulator: KC868Simulator,
+) -> None:
+    """Commands beyond the burst leave at the configured rate."""
+    transport = KTransport(
+        "127.0.0.1", simulator.port, TransportLimits(rate=10, burst=2)
+    )
+    try:
+        start = time.perf_counter()
+        for channel in range(1, 7):
+            await transport.call(relay_read(255, channel))
+        assert time.perf_counter() - start >= 0.25
+        assert transport.metrics.throttle.count == 4
+    finally:
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_timed_commands_do_not_wait_for_the_rate_limit(
+    simulator: KC868Simulator,
+) -> None:
+    """Pulse edges leave at once; the tokens they use slow later commands."""
+    transport = KTransport(
+        "127.0.0.1", simulator.port, TransportLimits(rate=2, burst=1)
+    )
+    try:
+        start = time.perf_counter()
+        await transport.call(relay_set(255, 1, True), Priority.TIMED)
+        await transport.call(relay_set(255, 1, False), Priority.TIMED)
+        assert time.perf_counter() - start < 0.2
+        assert transport.metrics.throttle.count == 0
+
+        await transport.call(relay_read(255, 1))
+        assert time.perf_counter() - start >= 0.5
+    finally:
+        transport.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("policy", "dropped", "rejected", "coalesced"),
+    [
+        (OverflowPolicy.DROP_OLDEST_POLL, 1, 0, 0),
+        (OverflowPolicy.REJECT, 0, 1, 0),
+        (OverflowPolicy.COALESCE, 0, 0, 1),
+    ],
+)
+async def test_full_queue_follows_overflow_policy(
+    simulator: KC868Simulator,
+    policy: OverflowPolicy,
+    dropped: int,
+    rejected: int,
+    coalesced: int,
+) -> None:
+    """A command finding the queue full is handled by the overflow policy."""
+    simulator.latency = 0.01
+    transport = KTransport(
+        "127.0.0.1",
+        simulator.port,
+        TransportLimits(rate=1000, burst=1000, queue_size=2, overflow=policy),
+    )
+    try:
+        busy = asyncio.create_task(transport.call(relay_set(255, 1, True)))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(transport.call(relay_read(255, 2), Priority.POLL)),
+            asyncio.create_task(transport.call(relay_set(255, 3, True))),
+        ]
+        await asyncio.sleep(0)
+        extra = asyncio.create_task(transport.call(relay_set(255, 3, True)))
+        results = await asyncio.gather(busy, *queued, extra, return_exceptions=True)
+
+        assert isinstance(results[1], PollDropped) == bool(dropped)
+        assert isinstance(results[3], ConnectionError) == bool(rejected)
+        assert transport.metrics.polls_dropped == dropped
+        assert transport.metrics.commands_rejected == rejected
+        assert transport.metrics.commands_coalesced == coalesced
+        assert transport.metrics.max_queue_depth <= 3
+    finally:
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_board_only_holds_up_its_own_queue(
+    simulator: KC868Simulator,
+) -> None:
+    """Each board's commands queue on their own; service time is recorded."""
+    slow = KC868Simulator(channel_count=8, latency=0.3)
+    await slow.start()
+    slow_transport = KTransport("127.0.0.1", slow.port)
+    fast_transport = KTransport("127.0.0.1", simulator.port)
+    try:
+        backlog = [
+            asyncio.create_task(slow_transport.call(relay_read(255, channel)))
+            for channel in range(1, 4)
+        ]
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        await fast_transport.call(relay_read(255, 1))
+        assert time.perf_counter() - start < 0.2
+        assert not any(task.done() for task in backlog)
+
+        await asyncio.gather(*backlog)
+        assert slow_transport.metrics.service.count == 3
+        assert slow_transport.metrics.busy_seconds >= 0.9
+        assert fast_transport.metrics.service.count == 1
+    finally:
+        slow_transport.close()
+        fast_transport.close()
+        await slow.stop()
+
+
+@pytest.mark.asyncio
+async def test_poll_link_keeps_polls_off_the_control_connection(
+    simulator: KC868Simulator,
+) -> None:
+    """With a poll link a slow poll does not delay a switch press."""
+    simulator.latency = 0.5
+    transport = KTransport("127.0.0.1", simulator.port)
+    transport.set_poll_link(True)
+    task = asyncio.create_task(transport.async_maintain())
+    try:
+        while simulator.connections < 2:
+            await asyncio.sleep(0.01)
+        poll = asyncio.create_task(transport.call(relay_state(255), Priority.POLL))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await transport.call(relay_set(255, 1, True))
+        # Sharing one connection it would wait for the poll first (~0.95 s).
+        assert time.perf_counter() - start < 0.8
+        await poll
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_poll_link_falls_back_to_one_connection(
+    simulator: KC868Simulator,
+) -> None:
+    """Polls use the only connection while the board refuses a second one."""
+    simulator.max_clients = 1
+    transport = KTransport("127.0.0.1", simulator.port)
+    transport.set_poll_link(True)
+    with patch("custom_components.kincony_kc868_tcp.RECONNECT_MIN_DELAY", 0.05):
+        task = asyncio.create_task(transport.async_maintain())
+        try:
+            while not simulator.refused:
+                await asyncio.sleep(0.01)
+            frame = await transport.call(relay_state(255), Priority.POLL)
+            assert frame.raw == "RELAY-STATE-255,0,OK"
+            assert simulator.connections == 1
+            # Refused links are retried with backoff, not in a tight loop.
+            await asyncio.sleep(0.3)
+            assert simulator.refused < 10
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            transport.close()